@@ -0,0 +1,135 @@
+"""
+Batch Solver
+Solves large batches of independent (grid, start, target, algorithm) jobs
+across a process pool
+"""
+
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import config
+from grid_environment import GridEnvironment, SearchAlgorithms
+from search_trace import SearchTrace
+
+
+class BatchJob(NamedTuple):
+    """One search request"""
+    grid: GridEnvironment
+    start: Tuple[int, int]
+    target: Tuple[int, int]
+    algorithm: str = "bfs"
+    seed: Optional[int] = None  # Seeds dynamic obstacle spawning when set
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one BatchJob"""
+    index: int  # Position of the job in the submitted batch
+    algorithm: str
+    success: bool
+    path: List[Tuple[int, int]]
+    path_cost: float
+    steps: int
+    expansions: int
+    peak_frontier: int
+    wall_time_s: float
+    trace: Optional[SearchTrace]  # Only when the solver records history
+
+
+def _solve_chunk(grid_blobs: List[bytes], tasks: List[Tuple], record_history: bool) -> List[Tuple]:
+    """Worker entry point: solve a chunk of tasks against grids sent as to_bytes() snapshots
+    
+    Paths travel back as flat cell-id arrays rather than lists of tuples.
+    """
+    grids: Dict[int, GridEnvironment] = {}
+    results = []
+    for index, grid_id, start, target, algorithm, seed in tasks:
+        grid = grids.get(grid_id)
+        if grid is None:
+            grid = GridEnvironment.from_bytes(grid_blobs[grid_id])
+            grids[grid_id] = grid
+        elif grid.obstacle_probability > 0:
+            # A previous job may have spawned obstacles; restore the submitted state
+            grid.load_bytes(grid_blobs[grid_id])
+        grid.start = start
+        grid.target = target
+        
+        if seed is not None:
+            random.seed(seed)
+        search = SearchAlgorithms(grid, record_trace=record_history)
+        started = time.perf_counter()
+        success = search.run(algorithm)
+        elapsed = time.perf_counter() - started
+        
+        path = search.path if success else []
+        path_ids = array('i', [r * grid.cols + c for r, c in path]).tobytes()
+        trace = search.trace
+        results.append((index, algorithm, success, grid.cols, path_ids, SearchAlgorithms.path_cost(path),
+                        len(trace), trace.expansions, trace.peak_frontier, elapsed,
+                        trace if record_history else None))
+    return results
+
+
+def _to_result(row: Tuple) -> BatchResult:
+    """Decode a worker result row"""
+    index, algorithm, success, cols, path_ids, path_cost, steps, expansions, peak_frontier, elapsed, trace = row
+    cells = array('i')
+    cells.frombytes(path_ids)
+    path = [divmod(cell, cols) for cell in cells]
+    return BatchResult(index, algorithm, success, path, path_cost, steps, expansions, peak_frontier, elapsed, trace)
+
+
+class BatchSolver:
+    """Spreads BatchJobs over a ProcessPoolExecutor in chunks
+    
+    Each chunk carries every distinct grid it needs exactly once, as a
+    compact to_bytes() snapshot. History recording is off by default.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, chunksize: int = 64, record_history: bool = False):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.record_history = record_history
+    
+    def _chunks(self, jobs: Iterable[BatchJob]) -> Iterator[Tuple[List[bytes], List[Tuple]]]:
+        """Group jobs into chunks of encoded (grid blobs, tasks)"""
+        blobs: List[bytes] = []
+        grid_ids: Dict[int, Tuple[int, GridEnvironment]] = {}
+        tasks: List[Tuple] = []
+        for index, job in enumerate(jobs):
+            if job.algorithm not in config.ALGORITHM_METHODS:
+                raise ValueError(f"Unknown algorithm: {job.algorithm}")
+            key = id(job.grid)
+            if key not in grid_ids:
+                # Holding the grid keeps its id from being reused by another grid of this chunk
+                grid_ids[key] = (len(blobs), job.grid)
+                blobs.append(job.grid.to_bytes())
+            tasks.append((index, grid_ids[key][0], tuple(job.start), tuple(job.target), job.algorithm, job.seed))
+            if len(tasks) == self.chunksize:
+                yield blobs, tasks
+                blobs, grid_ids, tasks = [], {}, []
+        if tasks:
+            yield blobs, tasks
+    
+    def solve(self, jobs: Iterable[BatchJob]) -> List[BatchResult]:
+        """Solve all jobs; results come back in submission order"""
+        return list(self.solve_iter(jobs, ordered=True))
+    
+    def solve_iter(self, jobs: Iterable[BatchJob], ordered: bool = True) -> Iterator[BatchResult]:
+        """Stream results, in submission order or (ordered=False) as chunks complete"""
+        if self.max_workers == 1:
+            # No pool: run in this process, still through the compact encoding
+            for blobs, tasks in self._chunks(jobs):
+                for row in _solve_chunk(blobs, tasks, self.record_history):
+                    yield _to_result(row)
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(_solve_chunk, blobs, tasks, self.record_history)
+                       for blobs, tasks in self._chunks(jobs)]
+            for future in (futures if ordered else as_completed(futures)):
+                for row in future.result():
+                    yield _to_result(row)
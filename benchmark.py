@@ -0,0 +1,293 @@
+"""
+Benchmarks for AI Pathfinder
+Headless performance measurements that run without the Pygame GUI
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import math
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+import config
+from grid_environment import GridEnvironment, SearchAlgorithms
+from instrumentation import Instrumentation, RunCounters
+from test_scenarios import TestScenarios
+from wavefront import wavefront
+
+Entry = Tuple[float, Tuple[int, int]]
+
+
+def _make_frontier(size: int, seed: int) -> List[Entry]:
+    """Build a UCS-like frontier of (cost, position) entries"""
+    rng = random.Random(seed)
+    side = max(1, int(math.sqrt(size)) + 1)
+    return [(rng.random() * side, divmod(i, side)) for i in range(size)]
+
+
+def _run_sorted_list_frontier(entries: List[Entry], expansions: int, seed: int):
+    """Original UCS frontier: sort the list and pop(0) on every expansion"""
+    rng = random.Random(seed)
+    frontier = list(entries)
+    for _ in range(expansions):
+        frontier.sort()
+        cost, pos = frontier.pop(0)
+        move_cost = config.DIAGONAL_MOVE_COST if rng.random() < 0.5 else config.STRAIGHT_MOVE_COST
+        frontier.append((cost + move_cost, pos))
+
+
+def _run_heap_frontier(entries: List[Entry], expansions: int, seed: int):
+    """Current UCS frontier: binary heap with lazy deletion"""
+    rng = random.Random(seed)
+    frontier = list(entries)
+    heapq.heapify(frontier)
+    for _ in range(expansions):
+        cost, pos = heapq.heappop(frontier)
+        move_cost = config.DIAGONAL_MOVE_COST if rng.random() < 0.5 else config.STRAIGHT_MOVE_COST
+        heapq.heappush(frontier, (cost + move_cost, pos))
+
+
+def bench_ucs_frontier(sizes: List[int], expansions: int = 20000, sorted_list_limit: int = 20000,
+                       seed: int = 0) -> List[Dict]:
+    """Measure UCS expansions/sec at a steady frontier size (one pop and one push per expansion)"""
+    results = []
+    for size in sizes:
+        entries = _make_frontier(size, seed)
+        for name, runner in (("heap", _run_heap_frontier), ("sorted_list", _run_sorted_list_frontier)):
+            if name == "sorted_list" and size > sorted_list_limit:
+                continue
+            # The sorted list is O(n log n) per expansion, so give it fewer expansions
+            count = expansions if name == "heap" else max(10, expansions * 100 // max(size, 1))
+            started = time.perf_counter()
+            runner(entries, count, seed)
+            elapsed = time.perf_counter() - started
+            per_expansion = elapsed / count
+            results.append({
+                "frontier": name,
+                "frontier_size": size,
+                "expansions": count,
+                "expansions_per_sec": count / elapsed,
+                "ns_per_expansion": per_expansion * 1e9,
+                # Roughly constant when an expansion costs O(log n)
+                "ns_per_expansion_log2n": per_expansion * 1e9 / math.log2(max(size, 2)),
+            })
+    return results
+
+
+def print_frontier_results(results: List[Dict]):
+    """Print frontier benchmark results as a table"""
+    print("=" * 72)
+    print("UCS frontier scaling (steady-state expansions)")
+    print("=" * 72)
+    print(f"{'frontier':<12}{'size':>10}{'expansions/s':>16}{'ns/exp':>14}{'ns/(exp*log2 n)':>18}")
+    for row in results:
+        print(f"{row['frontier']:<12}{row['frontier_size']:>10}{row['expansions_per_sec']:>16.0f}"
+              f"{row['ns_per_expansion']:>14.0f}{row['ns_per_expansion_log2n']:>18.1f}")
+
+
+def bench_wavefront(sizes: List[int], bfs_limit: int = 500) -> List[Dict]:
+    """Time a full distance field from the corner of an open size x size map, against bfs()"""
+    results = []
+    for size in sizes:
+        grid = GridEnvironment(size, size, wall_probability=0)
+        grid.obstacle_probability = 0
+        grid.target = (size - 1, size - 1)  # Farthest cell, so bfs() also visits the whole map
+        started = time.perf_counter()
+        wavefront(grid)
+        wavefront_time = time.perf_counter() - started
+        
+        bfs_time = None
+        if size <= bfs_limit:
+            search = SearchAlgorithms(grid, record_trace=False)
+            started = time.perf_counter()
+            search.bfs()
+            bfs_time = time.perf_counter() - started
+        results.append({"size": size, "wavefront_s": wavefront_time, "bfs_s": bfs_time})
+    return results
+
+
+def print_wavefront_results(results: List[Dict]):
+    """Print wavefront benchmark results as a table"""
+    print(f"{'size':>8}{'wavefront s':>14}{'bfs() s':>12}{'speedup':>10}")
+    for row in results:
+        if row["bfs_s"] is None:
+            print(f"{row['size']:>8}{row['wavefront_s']:>14.3f}{'-':>12}{'-':>10}")
+        else:
+            print(f"{row['size']:>8}{row['wavefront_s']:>14.3f}{row['bfs_s']:>12.3f}"
+                  f"{row['bfs_s'] / row['wavefront_s']:>9.0f}x")
+
+
+RESULT_FIELDS = [
+    "algorithm", "scenario", "rows", "cols", "seed", "success", "wall_time_s", "steps", "expansions",
+    "expansions_per_sec", "generated", "duplicates", "peak_frontier", "peak_memory_bytes", "path_length", "path_cost",
+]
+
+
+def get_scenarios() -> Dict[str, Callable[[], Set[Tuple[int, int]]]]:
+    """Every TestScenarios map by name, plus the default random-walls grid"""
+    scenarios = {"random_walls": None}
+    for name in sorted(vars(TestScenarios)):
+        if name.startswith("get_"):
+            scenarios[name[len("get_"):]] = getattr(TestScenarios, name)
+    return scenarios
+
+
+def scale_walls(walls: Set[Tuple[int, int]], rows: int, cols: int) -> Set[Tuple[int, int]]:
+    """Stretch a map designed for the config grid size to rows x cols, keeping its layout"""
+    base = np.zeros((config.GRID_ROWS, config.GRID_COLS), dtype=bool)
+    for r, c in walls:
+        if 0 <= r < config.GRID_ROWS and 0 <= c < config.GRID_COLS:
+            base[r, c] = True
+    row_map = np.arange(rows) * config.GRID_ROWS // rows
+    col_map = np.arange(cols) * config.GRID_COLS // cols
+    scaled = base[row_map][:, col_map]
+    return set(zip(*(axis.tolist() for axis in np.nonzero(scaled))))
+
+
+def build_grid(scenario: str, size: int, seed: int, obstacle_probability: float,
+               use_adjacency: bool = False) -> GridEnvironment:
+    """Create a size x size grid for a scenario with a fixed random seed"""
+    random.seed(seed)
+    walls_factory = get_scenarios()[scenario]
+    if walls_factory is None:
+        grid = GridEnvironment(size, size)
+    else:
+        grid = GridEnvironment(size, size, wall_probability=0)
+        grid.set_custom_walls(scale_walls(walls_factory(), size, size))
+    grid.obstacle_probability = obstacle_probability
+    if use_adjacency:
+        grid.build_adjacency()
+    return grid
+
+
+def run_case(algorithm: str, scenario: str, size: int, seed: int, obstacle_probability: float,
+             measure_memory: bool = True, use_adjacency: bool = False) -> Dict:
+    """Run one algorithm on one scenario and collect its metrics"""
+    grid = build_grid(scenario, size, seed, obstacle_probability, use_adjacency)
+    search = SearchAlgorithms(grid)
+    random.seed(seed)
+    started = time.perf_counter()
+    success = search.run(algorithm)
+    elapsed = time.perf_counter() - started
+    
+    counters = RunCounters()
+    if measure_memory:
+        # Separate instrumented pass: tracemalloc slows the search down and would skew the timing
+        grid = build_grid(scenario, size, seed, obstacle_probability, use_adjacency)
+        instrumentation = Instrumentation(trace_memory=True)
+        memory_search = SearchAlgorithms(grid, instrumentation=instrumentation)
+        random.seed(seed)
+        memory_search.run(algorithm)
+        counters = instrumentation.counters
+    
+    trace = search.trace
+    path = search.path if success else []
+    return {
+        "algorithm": algorithm,
+        "scenario": scenario,
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "seed": seed,
+        "success": success,
+        "wall_time_s": elapsed,
+        "steps": len(trace),
+        "expansions": trace.expansions,
+        "expansions_per_sec": trace.expansions / elapsed if elapsed > 0 else 0.0,
+        "generated": counters.generated if measure_memory else None,
+        "duplicates": counters.duplicates if measure_memory else None,
+        "peak_frontier": trace.peak_frontier,
+        "peak_memory_bytes": counters.peak_memory,
+        "path_length": len(path),
+        "path_cost": SearchAlgorithms.path_cost(path),
+    }
+
+
+def run_benchmarks(algorithms: List[str], scenarios: List[str], sizes: List[int], seeds: List[int],
+                   obstacle_probability: float = config.DYNAMIC_OBSTACLE_PROBABILITY,
+                   measure_memory: bool = True, use_adjacency: bool = False,
+                   progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """Run every algorithm x scenario x size x seed combination"""
+    results = []
+    for size in sizes:
+        for scenario in scenarios:
+            for seed in seeds:
+                for algorithm in algorithms:
+                    result = run_case(algorithm, scenario, size, seed, obstacle_probability,
+                                      measure_memory, use_adjacency)
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return results
+
+
+def write_results(results: List[Dict], output_format: str, stream):
+    """Write benchmark results as JSON or CSV"""
+    if output_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        json.dump(report, stream, indent=2)
+        stream.write("\n")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="AI Pathfinder headless benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    frontier_parser = subparsers.add_parser("frontier", help="UCS priority-queue scaling")
+    frontier_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    frontier_parser.add_argument("--expansions", type=int, default=20000)
+    frontier_parser.add_argument("--seed", type=int, default=0)
+    
+    wavefront_parser = subparsers.add_parser("wavefront", help="Vectorized distance field vs bfs()")
+    wavefront_parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    wavefront_parser.add_argument("--bfs-limit", type=int, default=500, help="Largest size to also run bfs() on")
+    
+    run_parser = subparsers.add_parser("run", help="Algorithms x scenarios x grid sizes")
+    run_parser.add_argument("--algorithms", nargs="+", choices=config.ALGORITHM_METHODS,
+                            default=config.ALGORITHM_METHODS)
+    run_parser.add_argument("--scenarios", nargs="+", choices=sorted(get_scenarios()),
+                            default=sorted(get_scenarios()))
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[config.GRID_ROWS])
+    run_parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    run_parser.add_argument("--obstacle-probability", type=float, default=config.DYNAMIC_OBSTACLE_PROBABILITY)
+    run_parser.add_argument("--adjacency", action="store_true", help="Precompute the neighbor index")
+    run_parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    run_parser.add_argument("--format", choices=["json", "csv"], default="json")
+    run_parser.add_argument("--output", help="Output file (default: stdout)")
+    
+    args = parser.parse_args()
+    if args.command == "frontier":
+        print_frontier_results(bench_ucs_frontier(args.sizes, args.expansions, seed=args.seed))
+    elif args.command == "wavefront":
+        print_wavefront_results(bench_wavefront(args.sizes, args.bfs_limit))
+    elif args.command == "run":
+        def progress(result):
+            print(f"{result['algorithm']:<22}{result['scenario']:<26}{result['rows']:>6}  seed={result['seed']:<4}"
+                  f"{result['wall_time_s']:>9.3f}s  {result['expansions']:>9} expanded", file=sys.stderr)
+        
+        results = run_benchmarks(args.algorithms, args.scenarios, args.sizes, args.seeds,
+                                 args.obstacle_probability, not args.no_memory, args.adjacency, progress)
+        if args.output:
+            with open(args.output, "w", newline="") as stream:
+                write_results(results, args.format, stream)
+        else:
+            write_results(results, args.format, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,21 @@ GRID_COLS = 20
 
 # GUI Settings
 CELL_SIZE = 30  # pixels
-WINDOW_WIDTH = GRID_COLS * CELL_SIZE + 400  # Extra space for controls
-WINDOW_HEIGHT = GRID_ROWS * CELL_SIZE + 100  # Extra space for info
+MAX_GRID_PIXELS = 600  # Larger grids are scaled down to fit this many pixels per side
+GRID_SCALE = min(CELL_SIZE, MAX_GRID_PIXELS / max(GRID_ROWS, GRID_COLS))  # On-screen pixels per cell
+GRID_WIDTH = round(GRID_COLS * GRID_SCALE)
+GRID_HEIGHT = round(GRID_ROWS * GRID_SCALE)
+WINDOW_WIDTH = GRID_WIDTH + 400  # Extra space for controls
+WINDOW_HEIGHT = GRID_HEIGHT + 100  # Extra space for info
 FPS = 60
+RENDER_MODE = "auto"  # "cells" (rounded rects), "array" (pygame.surfarray) or "auto" (array once scaled down)
+STEP_TIME_BUDGET = 0.01  # Max seconds of search steps applied per frame
+WORKER_QUEUE_SIZE = 4096  # Steps the background search may run ahead of the animation
 
 # Animation Settings
 ANIMATION_DELAY = 0.05  # seconds between steps (adjustable)
 FAST_MODE_DELAY = 0.01
+MIN_ANIMATION_DELAY = 0.00001  # Fastest speed; several steps are applied per frame below 1 / FPS
 
 # Dynamic Obstacles
 DYNAMIC_OBSTACLE_PROBABILITY = 0.02  # 2% chance per step
@@ -53,6 +61,10 @@ DIRECTIONS = [
     (-1, -1),  # Up-Left
 ]
 
+# Move costs used by UCS (diagonal moves cost ~sqrt(2))
+STRAIGHT_MOVE_COST = 1.0
+DIAGONAL_MOVE_COST = 1.414
+
 # Algorithm names
 ALGORITHMS = [
     "BFS - Breadth-First Search",
@@ -60,5 +72,17 @@ ALGORITHMS = [
     "UCS - Uniform-Cost Search",
     "DLS - Depth-Limited Search",
     "IDDFS - Iterative Deepening DFS",
-    "Bidirectional Search"
+    "Bidirectional Search",
+    "JPS - Jump Point Search"
+]
+
+# SearchAlgorithms method for each entry of ALGORITHMS
+ALGORITHM_METHODS = [
+    "bfs",
+    "dfs",
+    "ucs",
+    "dls",
+    "iddfs",
+    "bidirectional_search",
+    "jps"
 ]
@@ -0,0 +1,100 @@
+"""
+Distance Field Cache
+Keeps goal-rooted distance fields so paths to a few targets can be answered
+for many starts without searching again
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from grid_environment import GridEnvironment
+from wavefront import DistanceField, wavefront, weighted_wavefront
+
+# Cost model name -> field builder
+COST_MODELS = {
+    "hops": wavefront,               # Every move costs 1, like bfs()
+    "weighted": weighted_wavefront,  # 1 straight / 1.414 diagonal, like ucs()
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class DistanceFieldCache:
+    """LRU cache of distance fields rooted at targets, keyed by (map version, target, cost model)
+    
+    A field rooted at the target answers "how far, and which way" for every
+    start at once; path() then just follows the parent directions, which is
+    O(path length). Moves are reversible, so a field grown from the target
+    gives valid start -> target paths. Entries are dropped as soon as the
+    grid reports a wall or obstacle change, and least recently used fields
+    are evicted once their arrays exceed max_bytes.
+    """
+    
+    def __init__(self, grid: GridEnvironment, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._fields: "OrderedDict[Tuple, DistanceField]" = OrderedDict()
+        grid.add_change_listener(self._on_cells_changed)
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    def close(self):
+        """Stop listening to grid changes"""
+        self.grid.remove_change_listener(self._on_cells_changed)
+    
+    def clear(self):
+        self._fields.clear()
+        self.nbytes = 0
+    
+    def _on_cells_changed(self, cells: List[int]):
+        # Every cached field belongs to an older map version now
+        self.clear()
+    
+    def field(self, target: Optional[Tuple[int, int]] = None, cost_model: str = "hops") -> DistanceField:
+        """Distance field rooted at target (default grid.target), built on a miss"""
+        if cost_model not in COST_MODELS:
+            raise ValueError(f"Unknown cost model: {cost_model}")
+        if target is None:
+            target = self.grid.target
+        key = (self.grid.version, tuple(target), cost_model)
+        
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(key)
+            return field
+        
+        self.misses += 1
+        field = COST_MODELS[cost_model](self.grid, key[1])
+        self._fields[key] = field
+        self.nbytes += field.nbytes
+        # Evict least recently used fields, but always keep the one just built
+        while self.nbytes > self.max_bytes and len(self._fields) > 1:
+            _, evicted = self._fields.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return field
+    
+    def distance(self, start: Tuple[int, int], target: Optional[Tuple[int, int]] = None,
+                 cost_model: str = "hops") -> Optional[float]:
+        """Distance from start to target, or None if unreachable or either end is blocked"""
+        field = self.field(target, cost_model)
+        if not self.grid.is_valid(start) or not self.grid.is_valid(field.source) or not field.reachable(start):
+            return None
+        return field.distance[start].item()
+    
+    def path(self, start: Optional[Tuple[int, int]] = None, target: Optional[Tuple[int, int]] = None,
+             cost_model: str = "hops") -> List[Tuple[int, int]]:
+        """Shortest start -> target path (defaults: grid.start, grid.target)
+        
+        Empty if unreachable or if the start or target cell is not free.
+        """
+        if start is None:
+            start = self.grid.start
+        field = self.field(target, cost_model)
+        if not self.grid.is_valid(start) or not self.grid.is_valid(field.source):
+            return []
+        return field.path_from(tuple(start))
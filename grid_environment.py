@@ -1,89 +1,890 @@
 """
 Grid Environment and Search Algorithms
-Implements all 6 uninformed search algorithms with dynamic obstacle support
+Implements all 7 uninformed search algorithms with dynamic obstacle support
 """
 
+import heapq
+import math
 import random
+import struct
+from array import array
 from collections import deque
-from typing import List, Tuple, Set, Optional, Dict
+from itertools import chain
+from collections.abc import MutableSet
+from typing import List, Tuple, Set, Optional, Dict, Iterable, Iterator, Generator
+import numpy as np
 import config
+from instrumentation import Instrumentation
+from search_trace import SearchStep, SearchTrace, StepCounter, StepEvents, TraceHistory
+
+# Cell states stored in GridEnvironment.occupancy
+FREE = 0
+WALL = 1
+DYNAMIC_OBSTACLE = 2
+BORDER = 3  # Padding ring around the grid, never part of walls/dynamic_obstacles
+
+# best_depth entry of a cell not yet expanded in the current depth-limited round
+_UNSET_DEPTH = 2 ** 31 - 1
+
+# to_bytes() header: rows, cols, start, target, obstacle probability
+_SNAPSHOT_HEADER = struct.Struct("<IIiiiid")
+
+# splitmix64 constants; the Zobrist key of a (cell, state) pair is the mix of
+# 4 * cell + state, so no key table has to be stored
+_MASK64 = (1 << 64) - 1
+_GOLDEN, _MIX1, _MIX2 = 0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB
+
+
+def zobrist_key(cell: int, state: int) -> int:
+    """Zobrist key of one flat cell id holding one state (FREE cells contribute nothing)"""
+    if state == FREE:
+        return 0
+    z = ((cell << 2) + state) * _GOLDEN & _MASK64
+    z = (z ^ (z >> 30)) * _MIX1 & _MASK64
+    z = (z ^ (z >> 27)) * _MIX2 & _MASK64
+    return z ^ (z >> 31)
+
+
+def zobrist_keys(cells: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """Vectorized zobrist_key() (uint64 arithmetic wraps like the masked version)"""
+    z = ((cells.astype(np.uint64) << np.uint64(2)) + states.astype(np.uint64)) * np.uint64(_GOLDEN)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+    z ^= z >> np.uint64(31)
+    z[states == FREE] = 0
+    return z
+
+
+class CellSetView(MutableSet):
+    """Live set-like view of all grid cells holding one occupancy state
+    
+    A cell holds one state at a time, so walls and dynamic obstacles never
+    overwrite each other: add() only claims free cells and discard() only
+    frees cells of this view's own state.
+    """
+    
+    def __init__(self, grid: "GridEnvironment", state: int):
+        self._grid = grid
+        self._state = state
+    
+    def __contains__(self, pos) -> bool:
+        try:
+            r, c = pos
+        except (TypeError, ValueError):
+            return False
+        grid = self._grid
+        if r < 0 or r >= grid.rows or c < 0 or c >= grid.cols:
+            return False
+        return grid._cells[(r + 1) * grid._stride + c + 1] == self._state
+    
+    def __iter__(self):
+        stride = self._grid._stride
+        for index in np.flatnonzero(self._grid.occupancy == self._state).tolist():
+            r, c = divmod(index, stride)
+            yield (r - 1, c - 1)
+    
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._grid.occupancy == self._state))
+    
+    def add(self, pos: Tuple[int, int]):
+        """Mark a free cell with this state (cells outside the grid or holding another state are left alone)"""
+        if self._grid.is_valid(pos):
+            self._grid._set_cell(pos, self._state)
+    
+    def discard(self, pos: Tuple[int, int]):
+        """Free a cell if it currently holds this state"""
+        if pos in self:
+            self._grid._set_cell(pos, FREE)
+    
+    def clear(self):
+        """Free every cell holding this state in one vectorized pass"""
+        grid = self._grid
+        before = grid.occupancy.copy()
+        grid.occupancy[grid.occupancy == self._state] = FREE
+        grid._commit_bulk_update(before)
+    
+    def copy(self) -> Set[Tuple[int, int]]:
+        """Return a plain set snapshot of the view"""
+        return set(self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self)!r})"
+
+
+class AdjacencyIndex:
+    """Precomputed neighbor lists for every cell of a GridEnvironment
+    
+    CSR-style layout over flat cell ids (``r * cols + c``): cell ``i`` owns the
+    slots ``offsets[i]:offsets[i] + degree[i]`` of ``neighbors`` and ``costs``.
+    Every cell reserves one slot per direction, so a cell can be patched in
+    place without shifting any other cell's entries.
+    """
+    
+    def __init__(self, grid: "GridEnvironment"):
+        self.grid = grid
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.slots = len(config.DIRECTIONS)
+        size = self.rows * self.cols
+        self.offsets = np.arange(size + 1, dtype=np.int64) * self.slots
+        self.degree = np.zeros(size, dtype=np.uint8)
+        self.neighbors = np.full(size * self.slots, -1, dtype=np.int32)
+        self.costs = np.zeros(size * self.slots, dtype=np.float64)
+        self._direction_ids = [dr * self.cols + dc for dr, dc in config.DIRECTIONS]
+        # Lists materialized on first use, dropped when a cell is patched
+        self._neighbor_cache = {}
+        self._weighted_cache = {}
+        self._id_cache = {}
+        self._weighted_id_cache = {}
+        self.rebuild()
+    
+    def rebuild(self):
+        """Recompute every cell's entries from the grid occupancy"""
+        rows, cols, slots = self.rows, self.cols, self.slots
+        free = self.grid.occupancy == FREE
+        valid = np.empty((rows * cols, slots), dtype=bool)
+        for k, (dr, dc) in enumerate(config.DIRECTIONS):
+            valid[:, k] = free[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc].ravel()
+        
+        # Stable sort moves each cell's valid directions to the front, in DIRECTIONS order
+        order = np.argsort(~valid, axis=1, kind="stable")
+        ids = np.arange(rows * cols, dtype=np.int32)[:, None]
+        neighbor_ids = ids + np.array(self._direction_ids, dtype=np.int32)
+        move_costs = np.array([self.grid.move_cost(dr, dc) for dr, dc in config.DIRECTIONS])
+        valid_sorted = np.take_along_axis(valid, order, axis=1)
+        
+        self.degree[:] = valid.sum(axis=1)
+        self.neighbors[:] = np.where(valid_sorted, np.take_along_axis(neighbor_ids, order, axis=1), -1).ravel()
+        self.costs[:] = np.where(valid_sorted, move_costs[order], 0.0).ravel()
+        self._neighbor_cache.clear()
+        self._weighted_cache.clear()
+        self._id_cache.clear()
+        self._weighted_id_cache.clear()
+    
+    def patch(self, cells: Iterable[int]):
+        """Refresh the entries of changed cells and of every cell that neighbors them"""
+        cells = list(cells)
+        if len(cells) * (self.slots + 1) * 4 > self.rows * self.cols:
+            self.rebuild()
+            return
+        dirty = set()
+        for cell in cells:
+            r, c = divmod(cell, self.cols)
+            dirty.add(cell)
+            for dr, dc in config.DIRECTIONS:
+                if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols:
+                    dirty.add(cell + dr * self.cols + dc)
+        for cell in dirty:
+            self._patch_cell(cell)
+    
+    def _patch_cell(self, cell: int):
+        """Recompute one cell's slots from the grid occupancy"""
+        r, c = divmod(cell, self.cols)
+        start = cell * self.slots
+        count = 0
+        for neighbor, cost in self.grid._scan_neighbors((r, c)):
+            self.neighbors[start + count] = neighbor[0] * self.cols + neighbor[1]
+            self.costs[start + count] = cost
+            count += 1
+        self.neighbors[start + count:start + self.slots] = -1
+        self.costs[start + count:start + self.slots] = 0.0
+        self.degree[cell] = count
+        self._neighbor_cache.pop(cell, None)
+        self._weighted_cache.pop(cell, None)
+        self._id_cache.pop(cell, None)
+        self._weighted_id_cache.pop(cell, None)
+    
+    def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Get valid neighbors of a cell from the index"""
+        cell = pos[0] * self.cols + pos[1]
+        neighbors = self._neighbor_cache.get(cell)
+        if neighbors is None:
+            neighbors = [neighbor for neighbor, _ in self.get_weighted_neighbors(pos)]
+            self._neighbor_cache[cell] = neighbors
+        return list(neighbors)
+    
+    def get_weighted_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
+        """Get (neighbor, move cost) pairs of a cell from the index"""
+        cell = pos[0] * self.cols + pos[1]
+        weighted = self._weighted_cache.get(cell)
+        if weighted is None:
+            start = cell * self.slots
+            end = start + int(self.degree[cell])
+            cols = self.cols
+            weighted = [(divmod(neighbor, cols), cost) for neighbor, cost in
+                        zip(self.neighbors[start:end].tolist(), self.costs[start:end].tolist())]
+            self._weighted_cache[cell] = weighted
+        return list(weighted)
+    
+    def neighbor_ids(self, cell: int) -> List[int]:
+        """Flat ids of a cell's valid neighbors (a cached list, not to be modified)"""
+        neighbors = self._id_cache.get(cell)
+        if neighbors is None:
+            start = cell * self.slots
+            neighbors = self.neighbors[start:start + int(self.degree[cell])].tolist()
+            self._id_cache[cell] = neighbors
+        return neighbors
+    
+    def weighted_neighbor_ids(self, cell: int) -> List[Tuple[int, float]]:
+        """(neighbor id, move cost) pairs of a cell (a cached list, not to be modified)"""
+        weighted = self._weighted_id_cache.get(cell)
+        if weighted is None:
+            start = cell * self.slots
+            end = start + int(self.degree[cell])
+            weighted = list(zip(self.neighbors[start:end].tolist(), self.costs[start:end].tolist()))
+            self._weighted_id_cache[cell] = weighted
+        return weighted
+
+
+class FreeCellIndex:
+    """Dense set of free cell ids supporting O(1) insert, remove and uniform sampling
+    
+    ``cells`` holds the free flat ids (``r * cols + c``) in arbitrary order and
+    ``slots[id]`` is the position of that id in ``cells`` (-1 when not free).
+    Removal swaps the last id into the hole.
+    """
+    
+    def __init__(self, grid: "GridEnvironment"):
+        self.grid = grid
+        self.cols = grid.cols
+        self.cells = array('i')
+        self.slots = array('i')
+        self.rebuild()
+    
+    def __len__(self) -> int:
+        return len(self.cells)
+    
+    def __contains__(self, cell: int) -> bool:
+        return self.slots[cell] >= 0
+    
+    def rebuild(self):
+        """Reload every free cell from the grid occupancy in one vectorized pass"""
+        grid = self.grid
+        free = np.flatnonzero(grid.occupancy[1:-1, 1:-1] == FREE).astype(np.int32)
+        slots = np.full(grid.rows * grid.cols, -1, dtype=np.int32)
+        slots[free] = np.arange(len(free), dtype=np.int32)
+        self.cells = array('i', free.tobytes())
+        self.slots = array('i', slots.tobytes())
+    
+    def add(self, cell: int):
+        """Mark a cell as free"""
+        if self.slots[cell] < 0:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+    
+    def remove(self, cell: int):
+        """Mark a cell as blocked"""
+        slot = self.slots[cell]
+        if slot >= 0:
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[slot] = last
+                self.slots[last] = slot
+            self.slots[cell] = -1
+    
+    def update(self, cells: List[int]):
+        """Sync the given cells with the grid occupancy"""
+        if len(cells) * 4 > len(self.slots):
+            self.rebuild()
+            return
+        grid_cells = self.grid._cells
+        stride = self.grid._stride
+        cols = self.cols
+        for cell in cells:
+            r, c = divmod(cell, cols)
+            if grid_cells[(r + 1) * stride + c + 1] == FREE:
+                self.add(cell)
+            else:
+                self.remove(cell)
+    
+    def sample(self, exclude: Iterable[Tuple[int, int]] = ()) -> Optional[Tuple[int, int]]:
+        """Uniformly pick a free cell not in exclude, or None if there is none"""
+        excluded = {r * self.cols + c for r, c in exclude if self.grid.in_bounds((r, c))}
+        excluded = {cell for cell in excluded if self.slots[cell] >= 0}
+        if len(self.cells) <= len(excluded):
+            return None
+        while True:
+            cell = self.cells[random.randrange(len(self.cells))]
+            if cell not in excluded:
+                return divmod(cell, self.cols)
+
+
+class ComponentIndex:
+    """Connected components of the free cells, for O(1) reachability checks
+    
+    ``labels[id]`` is the component label of a free cell (-1 for blocked
+    cells); labels are joined through a union-find over label ids, so a
+    freed cell merging two regions never relabels the grid. Blocking a cell
+    can only split its region when its free neighbors are not connected to
+    each other around it; the labeling is then marked stale and redone in
+    one vectorized pass on the next query. Moves are assumed reversible.
+    """
+    
+    def __init__(self, grid: "GridEnvironment"):
+        self.grid = grid
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.labels = np.full(self.rows * self.cols, -1, dtype=np.int32)
+        self._parent = []  # Union-find parent of each label
+        self._moves = set(config.DIRECTIONS)
+        self.stale = True  # Labels are recomputed before the next query
+        self.rebuilds = 0  # Full labeling passes so far
+    
+    def rebuild(self):
+        """Label every free cell in one vectorized pass (hook and compress)"""
+        rows, cols = self.rows, self.cols
+        free = self.grid.occupancy[1:-1, 1:-1] == FREE
+        ids = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+        
+        # Free-to-free edges, one direction of each reversible move
+        heads, tails = [], []
+        for dr, dc in {max(move, (-move[0], -move[1])) for move in self._moves}:
+            r0, r1 = max(0, -dr), rows - max(0, dr)
+            c0, c1 = max(0, -dc), cols - max(0, dc)
+            both = free[r0:r1, c0:c1] & free[r0 + dr:r1 + dr, c0 + dc:c1 + dc]
+            heads.append(ids[r0:r1, c0:c1][both])
+            tails.append(ids[r0 + dr:r1 + dr, c0 + dc:c1 + dc][both])
+        heads, tails = np.concatenate(heads), np.concatenate(tails)
+        
+        # Hook the larger root of every edge onto the smaller one, then flatten
+        # the trees, until both ends of every edge share a root
+        root = ids.ravel().copy()
+        while len(heads):
+            head_roots, tail_roots = root[heads], root[tails]
+            split = head_roots != tail_roots
+            if not split.any():
+                break
+            heads, tails = heads[split], tails[split]
+            head_roots, tail_roots = head_roots[split], tail_roots[split]
+            np.minimum.at(root, np.maximum(head_roots, tail_roots), np.minimum(head_roots, tail_roots))
+            while True:
+                jumped = root[root]
+                if np.array_equal(jumped, root):
+                    break
+                root = jumped
+        
+        free = free.ravel()
+        roots, labels = np.unique(root[free], return_inverse=True)
+        self.labels[:] = -1
+        self.labels[free] = labels
+        self._parent = list(range(len(roots)))
+        self.stale = False
+        self.rebuilds += 1
+    
+    def _find(self, label: int) -> int:
+        parent = self._parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+    
+    def update(self, cells: List[int]):
+        """Follow state changes of the given flat cell ids"""
+        if self.stale:
+            return
+        if len(cells) * 16 > len(self.labels):
+            self.stale = True
+            return
+        grid_cells = self.grid._cells
+        stride = self.grid._stride
+        cols = self.cols
+        labels = self.labels
+        # Cells are applied one at a time, so labels always describe the
+        # regions of the labeled cells, even midway through a batch
+        for cell in cells:
+            r, c = divmod(cell, cols)
+            free = grid_cells[(r + 1) * stride + c + 1] == FREE
+            if free == (labels[cell] >= 0):
+                continue
+            neighbors = self._labeled_neighbors(cell)
+            if free:
+                # Join every region the freed cell touches
+                roots = {self._find(labels[neighbor]) for neighbor in neighbors}
+                if not roots:
+                    labels[cell] = len(self._parent)
+                    self._parent.append(len(self._parent))
+                    continue
+                root = min(roots)
+                for other in roots:
+                    self._parent[other] = root
+                labels[cell] = root
+            else:
+                labels[cell] = -1
+                if not self._locally_connected(neighbors):
+                    self.stale = True
+                    return
+    
+    def _labeled_neighbors(self, cell: int) -> List[int]:
+        r, c = divmod(cell, self.cols)
+        labels = self.labels
+        neighbors = []
+        for dr, dc in self._moves:
+            if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols:
+                neighbor = cell + dr * self.cols + dc
+                if labels[neighbor] >= 0:
+                    neighbors.append(neighbor)
+        return neighbors
+    
+    def _locally_connected(self, cells: List[int]) -> bool:
+        """Whether cells (the free neighbors of one cell) are connected to each other directly"""
+        if len(cells) < 2:
+            return True
+        moves = self._moves
+        positions = [divmod(cell, self.cols) for cell in cells]
+        reached = [positions.pop()]
+        for r, c in reached:
+            linked = [pos for pos in positions if (pos[0] - r, pos[1] - c) in moves]
+            for pos in linked:
+                positions.remove(pos)
+            reached.extend(linked)
+        return not positions
+    
+    def _roots(self, pos: Tuple[int, int]) -> Set[int]:
+        """Regions of a cell; a blocked cell counts as part of its free neighbors' regions"""
+        cell = pos[0] * self.cols + pos[1]
+        if self.labels[cell] >= 0:
+            return {self._find(self.labels[cell])}
+        return {self._find(self.labels[neighbor]) for neighbor in self._labeled_neighbors(cell)}
+    
+    def connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """Whether a path from a to b may exist (False means no search can find one)"""
+        if tuple(a) == tuple(b):
+            return True
+        if not (self.grid.in_bounds(a) and self.grid.in_bounds(b)):
+            return False
+        if self.stale:
+            self.rebuild()
+        return not self._roots(a).isdisjoint(self._roots(b))
+
 
 class GridEnvironment:
-    """Represents the grid world with start, target, walls, and dynamic obstacles"""
+    """Represents the grid world with start, target, walls, and dynamic obstacles
+    
+    Cell states live in ``occupancy``, a uint8 NumPy array padded with a one-cell
+    BORDER ring so neighbor lookups never need bounds checks. ``walls`` and
+    ``dynamic_obstacles`` are set-like views over that array.
+    """
     
-    def __init__(self, rows: int = config.GRID_ROWS, cols: int = config.GRID_COLS):
+    def __init__(self, rows: int = config.GRID_ROWS, cols: int = config.GRID_COLS,
+                 wall_probability: float = 0.2):
         self.rows = rows
         self.cols = cols
         self.start = (1, 1)  # Start position (row, col)
         self.target = (rows - 2, cols - 2)  # Target position
-        self.walls = set()  # Static walls
-        self.dynamic_obstacles = set()  # Dynamic obstacles that appear during search
-        self.generate_random_walls()
+        
+        # Padded occupancy grid; _cells is the flat buffer shared with the array
+        # so scalar lookups from Python stay cheap
+        self._stride = cols + 2
+        self._cells = bytearray((rows + 2) * self._stride)
+        self.occupancy = np.frombuffer(self._cells, dtype=np.uint8).reshape(rows + 2, self._stride)
+        self.occupancy[0, :] = BORDER
+        self.occupancy[-1, :] = BORDER
+        self.occupancy[:, 0] = BORDER
+        self.occupancy[:, -1] = BORDER
+        self._direction_offsets = [((dr, dc), dr * self._stride + dc, self.move_cost(dr, dc))
+                                   for dr, dc in config.DIRECTIONS]
+        # (padded offset, flat id offset, move cost) per direction, for the id-based lookups
+        self._id_offsets = [(offset, dr * cols + dc, cost) for (dr, dc), offset, cost in self._direction_offsets]
+        
+        self._walls = CellSetView(self, WALL)  # Static walls
+        self._dynamic_obstacles = CellSetView(self, DYNAMIC_OBSTACLE)  # Dynamic obstacles that appear during search
+        self.adjacency = None  # Optional AdjacencyIndex, see build_adjacency()
+        self.components = None  # Optional ComponentIndex, see build_components()
+        self.free_cells = FreeCellIndex(self)  # Free cells for obstacle spawning
+        self._change_listeners = []  # Callbacks notified with the flat ids of changed cells
+        self.version = 0  # Bumped on every wall or obstacle change
+        self.state_hash = 0  # Zobrist hash of walls and dynamic obstacles, see zobrist_key()
+        self.obstacle_probability = config.DYNAMIC_OBSTACLE_PROBABILITY  # Spawn chance per search step
+        if wall_probability > 0:
+            self.generate_random_walls(wall_probability)
+    
+    @property
+    def walls(self) -> CellSetView:
+        """Static walls"""
+        return self._walls
+    
+    @walls.setter
+    def walls(self, walls: Iterable[Tuple[int, int]]):
+        self.set_custom_walls(walls)
+    
+    @property
+    def dynamic_obstacles(self) -> CellSetView:
+        """Dynamic obstacles that appear during search"""
+        return self._dynamic_obstacles
+    
+    @dynamic_obstacles.setter
+    def dynamic_obstacles(self, obstacles: Iterable[Tuple[int, int]]):
+        obstacles = list(obstacles)  # May be the live view itself (e.g. grid.dynamic_obstacles |= ...)
+        self.reset_dynamic_obstacles()
+        self._fill_cells(obstacles, DYNAMIC_OBSTACLE)
+    
+    @staticmethod
+    def move_cost(dr: int, dc: int) -> float:
+        """Cost of one move (diagonal moves cost sqrt(2), straight moves cost 1)"""
+        return config.DIAGONAL_MOVE_COST if abs(dr) + abs(dc) == 2 else config.STRAIGHT_MOVE_COST
+    
+    def build_adjacency(self) -> AdjacencyIndex:
+        """Precompute neighbor lists for every cell; later wall/obstacle changes patch it in place"""
+        self.adjacency = AdjacencyIndex(self)
+        return self.adjacency
+    
+    def build_components(self) -> ComponentIndex:
+        """Track connected regions of free cells; the searches then give up at once on unreachable targets
+        
+        The labeling is computed on the first query and follows later wall
+        and obstacle changes.
+        """
+        self.components = ComponentIndex(self)
+        return self.components
+    
+    def reachable(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """Whether b may be reachable from a (always True without build_components())"""
+        return self.components is None or self.components.connected(a, b)
+    
+    def to_bytes(self) -> bytes:
+        """Compact snapshot: a small header, then wall and obstacle bitmaps (2 bits per cell)"""
+        interior = self.occupancy[1:-1, 1:-1]
+        header = _SNAPSHOT_HEADER.pack(self.rows, self.cols, *self.start, *self.target, self.obstacle_probability)
+        return header + np.packbits(interior == WALL).tobytes() + np.packbits(interior == DYNAMIC_OBSTACLE).tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GridEnvironment":
+        """Rebuild a grid from to_bytes() output"""
+        rows, cols, start_r, start_c, target_r, target_c, obstacle_probability = _SNAPSHOT_HEADER.unpack_from(data)
+        grid = cls(rows, cols, wall_probability=0)
+        grid.start = (start_r, start_c)
+        grid.target = (target_r, target_c)
+        grid.obstacle_probability = obstacle_probability
+        grid.load_bytes(data)
+        return grid
+    
+    def load_bytes(self, data: bytes):
+        """Restore walls and dynamic obstacles from to_bytes() output of a same-sized grid"""
+        rows, cols = _SNAPSHOT_HEADER.unpack_from(data)[:2]
+        if (rows, cols) != (self.rows, self.cols):
+            raise ValueError(f"snapshot is {rows}x{cols}, grid is {self.rows}x{self.cols}")
+        size = rows * cols
+        bitmap_bytes = (size + 7) // 8
+        bits = np.frombuffer(data, dtype=np.uint8, offset=_SNAPSHOT_HEADER.size, count=2 * bitmap_bytes)
+        walls = np.unpackbits(bits[:bitmap_bytes], count=size).reshape(rows, cols).astype(bool)
+        obstacles = np.unpackbits(bits[bitmap_bytes:], count=size).reshape(rows, cols).astype(bool)
+        
+        before = self.occupancy.copy()
+        interior = self.occupancy[1:-1, 1:-1]
+        interior[:] = FREE
+        interior[obstacles] = DYNAMIC_OBSTACLE
+        interior[walls] = WALL
+        self._commit_bulk_update(before)
+        # Reload the free-cell order too, so obstacle spawning depends only on the snapshot and the seed
+        self.free_cells.rebuild()
+    
+    def add_change_listener(self, callback):
+        """Call callback(cells) with the flat ids (r * cols + c) of cells whose state changed"""
+        self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback):
+        """Stop notifying a callback registered with add_change_listener()"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def in_bounds(self, pos: Tuple[int, int]) -> bool:
+        """Check if position lies inside the grid"""
+        r, c = pos
+        return 0 <= r < self.rows and 0 <= c < self.cols
+    
+    def _set_cell(self, pos: Tuple[int, int], state: int):
+        """Write one cell state (pos must be in bounds)"""
+        r, c = pos
+        index = (r + 1) * self._stride + c + 1
+        previous = self._cells[index]
+        if previous != state:
+            self._cells[index] = state
+            cell = r * self.cols + c
+            self.state_hash ^= zobrist_key(cell, previous) ^ zobrist_key(cell, state)
+            self._cells_changed([cell])
+    
+    def _fill_cells(self, positions: Iterable[Tuple[int, int]], state: int):
+        """Write a state to many cells at once, dropping positions outside the grid"""
+        before = self.occupancy.copy()
+        self._write_cells(positions, state)
+        self._commit_bulk_update(before)
+    
+    def _write_cells(self, positions: Iterable[Tuple[int, int]], state: int):
+        """Vectorized cell write without change notification (only free cells take the state, like CellSetView.add())"""
+        cells = np.array([tuple(pos) for pos in positions], dtype=np.int64).reshape(-1, 2)
+        rows, cols = cells[:, 0], cells[:, 1]
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        rows, cols = rows[inside] + 1, cols[inside] + 1
+        free = self.occupancy[rows, cols] == FREE
+        self.occupancy[rows[free], cols[free]] = state
+    
+    def _commit_bulk_update(self, before: np.ndarray):
+        """Notify indexes of every cell that differs from the occupancy snapshot"""
+        before = before[1:-1, 1:-1].ravel()
+        after = self.occupancy[1:-1, 1:-1].ravel()
+        changed = np.flatnonzero(before != after)
+        if len(changed):
+            keys = zobrist_keys(changed, before[changed]) ^ zobrist_keys(changed, after[changed])
+            self.state_hash ^= int(np.bitwise_xor.reduce(keys))
+            self._cells_changed(changed.tolist())
+    
+    def _cells_changed(self, cells: List[int]):
+        """Patch derived indexes after the given flat cell ids changed state"""
+        self.version += 1
+        self.free_cells.update(cells)
+        if self.adjacency is not None:
+            self.adjacency.patch(cells)
+        if self.components is not None:
+            self.components.update(cells)
+        for callback in list(self._change_listeners):
+            callback(cells)
     
     def generate_random_walls(self, wall_probability: float = 0.2):
         """Generate random walls in the grid"""
+        before = self.occupancy.copy()
+        cells = self._cells
+        stride = self._stride
         for r in range(self.rows):
             for c in range(self.cols):
                 # Don't place walls on start, target, or borders
                 if (r, c) == self.start or (r, c) == self.target:
                     continue
                 if random.random() < wall_probability:
-                    self.walls.add((r, c))
+                    cells[(r + 1) * stride + c + 1] = WALL
+        self._commit_bulk_update(before)
     
-    def set_custom_walls(self, walls: Set[Tuple[int, int]]):
-        """Set custom wall positions"""
-        self.walls = walls.copy()
+    def set_custom_walls(self, walls: Iterable[Tuple[int, int]]):
+        """Set custom wall positions (positions outside the grid are ignored)"""
+        walls = list(walls)  # May be the live view itself (e.g. grid.walls |= ...)
+        before = self.occupancy.copy()
+        self.occupancy[self.occupancy == WALL] = FREE
+        self._write_cells(walls, WALL)
+        self._commit_bulk_update(before)
     
     def is_valid(self, pos: Tuple[int, int]) -> bool:
         """Check if position is valid (within bounds and not a wall)"""
         r, c = pos
         if r < 0 or r >= self.rows or c < 0 or c >= self.cols:
             return False
-        if pos in self.walls or pos in self.dynamic_obstacles:
-            return False
-        return True
+        return self._cells[(r + 1) * self._stride + c + 1] == FREE
     
     def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Get valid neighbors in the specified movement order"""
+        if self.adjacency is not None:
+            return self.adjacency.get_neighbors(pos)
         r, c = pos
-        neighbors = []
-        for dr, dc in config.DIRECTIONS:
-            new_pos = (r + dr, c + dc)
-            if self.is_valid(new_pos):
-                neighbors.append(new_pos)
-        return neighbors
+        cells = self._cells
+        base = (r + 1) * self._stride + c + 1
+        # The BORDER ring makes out-of-grid neighbors non-FREE, so no bounds checks
+        return [(r + dr, c + dc) for (dr, dc), offset, _ in self._direction_offsets if cells[base + offset] == FREE]
+    
+    def get_weighted_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
+        """Get (neighbor, move cost) pairs in the specified movement order"""
+        if self.adjacency is not None:
+            return self.adjacency.get_weighted_neighbors(pos)
+        return self._scan_neighbors(pos)
+    
+    def neighbor_ids(self, cell: int) -> List[int]:
+        """Flat ids (r * cols + c) of a cell's valid neighbors, in the specified movement order
+        
+        The id-based counterpart of get_neighbors() used by the searches;
+        the returned list must not be modified.
+        """
+        if self.adjacency is not None:
+            return self.adjacency.neighbor_ids(cell)
+        cells = self._cells
+        base = cell + (cell // self.cols) * 2 + self._stride + 1  # Padded index of the cell
+        return [cell + step for offset, step, _ in self._id_offsets if cells[base + offset] == FREE]
+    
+    def weighted_neighbor_ids(self, cell: int) -> List[Tuple[int, float]]:
+        """(neighbor id, move cost) pairs of a cell, in the specified movement order"""
+        if self.adjacency is not None:
+            return self.adjacency.weighted_neighbor_ids(cell)
+        cells = self._cells
+        base = cell + (cell // self.cols) * 2 + self._stride + 1
+        return [(cell + step, cost) for offset, step, cost in self._id_offsets if cells[base + offset] == FREE]
+    
+    def _scan_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[Tuple[int, int], float]]:
+        """Compute (neighbor, move cost) pairs directly from the occupancy grid"""
+        r, c = pos
+        cells = self._cells
+        base = (r + 1) * self._stride + c + 1
+        return [((r + dr, c + dc), cost) for (dr, dc), offset, cost in self._direction_offsets
+                if cells[base + offset] == FREE]
     
     def spawn_dynamic_obstacle(self):
         """Randomly spawn a dynamic obstacle"""
-        if random.random() < config.DYNAMIC_OBSTACLE_PROBABILITY:
-            # Find a random empty cell
-            empty_cells = []
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    pos = (r, c)
-                    if pos != self.start and pos != self.target and pos not in self.walls and pos not in self.dynamic_obstacles:
-                        empty_cells.append(pos)
-            
-            if empty_cells:
-                obstacle_pos = random.choice(empty_cells)
-                self.dynamic_obstacles.add(obstacle_pos)
+        if random.random() < self.obstacle_probability:
+            # Pick a random empty cell (never the start or target) from the free-cell index
+            obstacle_pos = self.free_cells.sample((self.start, self.target))
+            
+            if obstacle_pos is not None:
+                self._set_cell(obstacle_pos, DYNAMIC_OBSTACLE)
                 return obstacle_pos
         return None
     
     def reset_dynamic_obstacles(self):
-        """Clear all dynamic obstacles"""
-        self.dynamic_obstacles.clear()
+        """Clear all dynamic obstacles (the free-cell index is rebuilt in bulk when many are cleared)"""
+        self._dynamic_obstacles.clear()
 
 
 class SearchAlgorithms:
-    """Implements all 6 uninformed search algorithms"""
+    """Implements all 7 uninformed search algorithms
+    
+    Each algorithm is written as a generator (``bfs_steps()`` etc.) that
+    yields once per step; ``bfs()`` and friends simply run it to the end,
+    while stream() hands the steps out one at a time; both fail at once on a
+    target the grid knows to be cut off (see _checked()). Inside the searches
+    cells are flat ids (``r * cols + c``) and parent, cost and membership
+    maps are typed arrays indexed by id; positions only appear in the path.
+    """
     
-    def __init__(self, grid: GridEnvironment):
+    def __init__(self, grid: GridEnvironment, record_trace: bool = True,
+                 instrumentation: Optional[Instrumentation] = None):
         self.grid = grid
-        self.frontier_history = []  # Track frontier nodes at each step
-        self.explored_history = []  # Track explored nodes at each step
+        self.record_trace = record_trace  # False keeps only run statistics (StepCounter)
+        self._trace_type = None  # Overrides the trace kind while stream() starts a run
+        self.trace = self._make_trace()  # Per-step record of the last run
         self.path = []  # Final path
-        self.dynamic_obstacle_spawned = []  # Track when obstacles spawn
+        self.round_stats = []  # Per-round statistics of the last dls()/iddfs() run
+        self.instrumentation = None  # Optional Instrumentation, see instrument()
+        if instrumentation is not None:
+            self.instrument(instrumentation)
+    
+    def instrument(self, instrumentation: Optional[Instrumentation]):
+        """Attach per-run counters, timers and callbacks (None detaches them)
+        
+        Nothing is wrapped while no instrumentation is attached, so the
+        searches pay nothing for this hook.
+        """
+        self.instrumentation = instrumentation
+    
+    def _hooked(self, function, kind: str):
+        """function itself, or its instrumentation wrapper (see Instrumentation.wrap())
+        
+        Searches look up their successor and spawning functions through this
+        once per run, so the wrappers belong to this search alone; the
+        shared grid is never patched.
+        """
+        if self.instrumentation is None:
+            return function
+        return self.instrumentation.wrap(function, kind)
+    
+    @property
+    def frontier_history(self) -> TraceHistory:
+        """Frontier nodes at each step, rebuilt from the trace on access"""
+        return TraceHistory(self._recorded_trace(), "frontier")
+    
+    @property
+    def explored_history(self) -> TraceHistory:
+        """Explored nodes at each step, rebuilt from the trace on access"""
+        return TraceHistory(self._recorded_trace(), "explored")
+    
+    @property
+    def dynamic_obstacle_spawned(self) -> List[int]:
+        """Steps on which a dynamic obstacle spawned"""
+        return self.trace.obstacle_steps
+    
+    def _make_trace(self):
+        if self._trace_type is not None:
+            return self._trace_type(self.grid.rows, self.grid.cols)
+        if self.record_trace:
+            return SearchTrace(self.grid.rows, self.grid.cols)
+        return StepCounter(self.grid.rows, self.grid.cols)
+    
+    def _recorded_trace(self) -> SearchTrace:
+        if not isinstance(self.trace, SearchTrace):
+            raise RuntimeError("history is not recorded (record_trace=False)")
+        return self.trace
+    
+    def _new_trace(self):
+        """Start recording a new run; returns the trace the algorithm records to"""
+        self.trace = self._make_trace()
+        if self.instrumentation is not None:
+            return self.instrumentation.begin_run(self.trace)
+        return self.trace
+    
+    def _end_run(self):
+        if self.instrumentation is not None:
+            self.instrumentation.end_run()
+    
+    def run(self, algorithm: str) -> bool:
+        """Run an algorithm by method name (see config.ALGORITHM_METHODS)"""
+        if algorithm not in config.ALGORITHM_METHODS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        return getattr(self, algorithm)()
+    
+    def _checked(self, steps: Generator[None, None, bool]) -> Generator[None, None, bool]:
+        """steps, or a run that fails at once when the target is known to be
+        cut off from the start (see GridEnvironment.build_components())"""
+        if self.grid.reachable(self.grid.start, self.grid.target):
+            return steps
+        steps.close()
+        return self._cut_off_steps()
+    
+    def _cut_off_steps(self) -> Generator[None, None, bool]:
+        self._new_trace()
+        self.round_stats = []
+        return False
+        yield  # Makes this a generator
+    
+    def _run_steps(self, steps: Generator[None, None, bool]) -> bool:
+        """Run a step generator to the end and return its result"""
+        steps = self._checked(steps)
+        try:
+            while True:
+                next(steps)
+        except StopIteration as finished:
+            return finished.value
+        finally:
+            self._end_run()
+    
+    def stream(self, algorithm: str, events: bool = True) -> Iterator[SearchStep]:
+        """Run an algorithm lazily, yielding each step once its events are known
+        
+        Nothing runs until the first step is pulled, and a caller that stops
+        iterating never pays for the remaining steps. With record_trace=False
+        only the latest steps' events are buffered (StepEvents), or none at
+        all with events=False. The last step has done=True and carries the
+        result; self.path is set as usual.
+        """
+        if algorithm not in config.ALGORITHM_METHODS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        steps = self._checked(getattr(self, algorithm + "_steps")())
+        if not self.record_trace:
+            self._trace_type = StepEvents if events else StepCounter
+        # The run ends however the stream does: finished, abandoned or failed
+        try:
+            try:
+                next(steps)
+            except StopIteration as finished:
+                # Over before its first step (e.g. a cut-off target): one empty, final step
+                self._end_run()
+                yield SearchStep(0, [], True, finished.value)
+                return
+            finally:
+                self._trace_type = None
+            
+            trace = self.trace
+            with_events = hasattr(trace, "step_events")
+            step = 0
+            while True:
+                try:
+                    next(steps)
+                except StopIteration as finished:
+                    self._end_run()
+                    yield SearchStep(step, list(trace.step_events(step)) if with_events else [], True, finished.value)
+                    return
+                # The search has begun the next step, so this one is complete
+                yield SearchStep(step, list(trace.step_events(step)) if with_events else [], False, None)
+                step += 1
+        finally:
+            self._end_run()
+    
+    @staticmethod
+    def path_cost(path: List[Tuple[int, int]]) -> float:
+        """Total move cost of a path (diagonal moves cost sqrt(2), straight moves cost 1)"""
+        return sum((GridEnvironment.move_cost(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:])), 0.0)
     
     def reconstruct_path(self, came_from: Dict, current: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Reconstruct path from start to current using came_from dictionary"""
@@ -94,285 +895,531 @@ class SearchAlgorithms:
         path.reverse()
         return path
     
+    def _cell_id(self, pos: Tuple[int, int]) -> int:
+        return pos[0] * self.grid.cols + pos[1]
+    
+    def _parent_path(self, parents: array, cell: int) -> List[Tuple[int, int]]:
+        """Follow an array of parent ids (negative at the root) from cell back to the root"""
+        cols = self.grid.cols
+        path = []
+        while cell >= 0:
+            path.append(divmod(cell, cols))
+            cell = parents[cell]
+        path.reverse()
+        return path
+    
     def bfs(self) -> bool:
         """Breadth-First Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+        return self._run_steps(self.bfs_steps())
+    
+    def bfs_steps(self) -> Generator[None, None, bool]:
+        """Breadth-First Search, yielding once per step (see stream())"""
+        trace = self._new_trace()
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        neighbor_ids = self._hooked(grid.neighbor_ids, "successors")
+        start, target = self._cell_id(grid.start), self._cell_id(grid.target)
         
-        queue = deque([self.grid.start])
-        came_from = {}
-        explored = set()
+        queue = deque([start])
+        # A cell is queued at most once, so one flag covers "queued or explored"
+        reached = bytearray(grid.rows * grid.cols)
+        reached[start] = 1
+        came_from = array('i', [-1]) * (grid.rows * grid.cols)
         
         while queue:
             # Spawn dynamic obstacle
-            obstacle = self.grid.spawn_dynamic_obstacle()
-            if obstacle:
-                self.dynamic_obstacle_spawned.append(len(self.frontier_history))
+            obstacle = spawn_obstacle()
             
             # Record current state
-            self.frontier_history.append(list(queue))
-            self.explored_history.append(explored.copy())
+            if trace.begin_step(len(queue), obstacle):
+                trace.checkpoint(queue)
+            yield  # Step begun; a streaming caller may pause here
             
             current = queue.popleft()
+            trace.pop(current)
             
-            if current == self.grid.target:
-                self.path = self.reconstruct_path(came_from, current)
+            if current == target:
+                self.path = self._parent_path(came_from, current)
                 return True
             
-            if current in explored:
-                continue
+            trace.explore(current)
             
-            explored.add(current)
-            
-            for neighbor in self.grid.get_neighbors(current):
-                if neighbor not in explored and neighbor not in queue:
+            for neighbor in neighbor_ids(current):
+                if not reached[neighbor]:
                     queue.append(neighbor)
+                    reached[neighbor] = 1
+                    trace.push(neighbor)
                     came_from[neighbor] = current
         
         return False
     
     def dfs(self) -> bool:
         """Depth-First Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+        return self._run_steps(self.dfs_steps())
+    
+    def dfs_steps(self) -> Generator[None, None, bool]:
+        """Depth-First Search, yielding once per step (see stream())"""
+        trace = self._new_trace()
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        neighbor_ids = self._hooked(grid.neighbor_ids, "successors")
+        start, target = self._cell_id(grid.start), self._cell_id(grid.target)
         
-        stack = [self.grid.start]
-        came_from = {}
-        explored = set()
+        stack = [start]
+        # A cell is stacked at most once, so one flag covers "stacked or explored"
+        reached = bytearray(grid.rows * grid.cols)
+        reached[start] = 1
+        came_from = array('i', [-1]) * (grid.rows * grid.cols)
         
         while stack:
             # Spawn dynamic obstacle
-            obstacle = self.grid.spawn_dynamic_obstacle()
-            if obstacle:
-                self.dynamic_obstacle_spawned.append(len(self.frontier_history))
+            obstacle = spawn_obstacle()
             
             # Record current state
-            self.frontier_history.append(stack.copy())
-            self.explored_history.append(explored.copy())
+            if trace.begin_step(len(stack), obstacle):
+                trace.checkpoint(stack)
+            yield  # Step begun; a streaming caller may pause here
             
             current = stack.pop()
+            trace.pop(current)
             
-            if current == self.grid.target:
-                self.path = self.reconstruct_path(came_from, current)
+            if current == target:
+                self.path = self._parent_path(came_from, current)
                 return True
             
-            if current in explored:
-                continue
-            
-            explored.add(current)
+            trace.explore(current)
             
             # Add neighbors in reverse order so they're popped in correct order
-            neighbors = self.grid.get_neighbors(current)
-            for neighbor in reversed(neighbors):
-                if neighbor not in explored and neighbor not in stack:
+            for neighbor in reversed(neighbor_ids(current)):
+                if not reached[neighbor]:
                     stack.append(neighbor)
+                    reached[neighbor] = 1
+                    trace.push(neighbor)
                     came_from[neighbor] = current
         
         return False
     
     def ucs(self) -> bool:
         """Uniform-Cost Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+        return self._run_steps(self.ucs_steps())
+    
+    def ucs_steps(self) -> Generator[None, None, bool]:
+        """Uniform-Cost Search, yielding once per step (see stream())"""
+        trace = self._new_trace()
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        weighted_neighbor_ids = self._hooked(grid.weighted_neighbor_ids, "successors")
+        start, target = self._cell_id(grid.start), self._cell_id(grid.target)
+        size = grid.rows * grid.cols
         
-        # Priority queue: (cost, position)
-        # Using list and sorting for simplicity
-        frontier = [(0, self.grid.start)]
-        came_from = {}
-        cost_so_far = {self.grid.start: 0}
-        explored = set()
+        # Priority queue: binary heap of (cost, cell id); ids are row-major, so ties
+        # break in the same order as a fully sorted frontier of positions. Stale
+        # entries are skipped lazily when popped (see the explored check below)
+        frontier = [(0.0, start)]
+        came_from = array('i', [-1]) * size
+        cost_so_far = array('d', [math.inf]) * size
+        cost_so_far[start] = 0.0
+        explored = bytearray(size)
         
         while frontier:
             # Spawn dynamic obstacle
-            obstacle = self.grid.spawn_dynamic_obstacle()
-            if obstacle:
-                self.dynamic_obstacle_spawned.append(len(self.frontier_history))
+            obstacle = spawn_obstacle()
             
             # Record current state
-            self.frontier_history.append([pos for _, pos in frontier])
-            self.explored_history.append(explored.copy())
+            if trace.begin_step(len(frontier), obstacle):
+                trace.checkpoint(cell for _, cell in frontier)
+            yield  # Step begun; a streaming caller may pause here
             
-            # Sort by cost and get lowest
-            frontier.sort()
-            current_cost, current = frontier.pop(0)
+            # Get lowest cost entry
+            current_cost, current = heapq.heappop(frontier)
+            trace.pop(current)
             
-            if current == self.grid.target:
-                self.path = self.reconstruct_path(came_from, current)
+            if current == target:
+                self.path = self._parent_path(came_from, current)
                 return True
             
-            if current in explored:
+            if explored[current]:
                 continue
             
-            explored.add(current)
+            explored[current] = 1
+            trace.explore(current)
             
-            for neighbor in self.grid.get_neighbors(current):
-                # Calculate cost (diagonal moves cost sqrt(2), straight moves cost 1)
-                dr = abs(neighbor[0] - current[0])
-                dc = abs(neighbor[1] - current[1])
-                move_cost = 1.414 if (dr + dc) == 2 else 1.0
+            # Move costs come with the neighbors (diagonal moves cost sqrt(2), straight moves cost 1)
+            for neighbor, move_cost in weighted_neighbor_ids(current):
                 new_cost = current_cost + move_cost
                 
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                if new_cost < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = new_cost
-                    frontier.append((new_cost, neighbor))
+                    heapq.heappush(frontier, (new_cost, neighbor))
+                    trace.push(neighbor)
                     came_from[neighbor] = current
         
         return False
     
-    def dls(self, limit: int = config.DEPTH_LIMIT) -> bool:
-        """Depth-Limited Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+    def _jps_directions(self, cell: int, parent: int) -> List[Tuple[int, int]]:
+        """Directions worth jumping in from a jump point (JPS neighbor pruning)
         
-        # Stack: (position, depth)
-        stack = [(self.grid.start, 0)]
-        came_from = {}
-        explored = set()
+        Cells are padded flat ids (parent is -1 at the start). Only natural
+        neighbors (straight ahead, or the three moves ahead of a diagonal) and
+        forced neighbors (next to a blocked cell beside the path) are kept.
+        """
+        if parent < 0:
+            return config.DIRECTIONS
+        cells = self.grid._cells
+        stride = self.grid._stride
+        r, c = divmod(cell, stride)
+        pr, pc = divmod(parent, stride)
+        dr = (r > pr) - (r < pr)
+        dc = (c > pc) - (c < pc)
         
-        while stack:
+        if dr and dc:
+            directions = [(dr, 0), (0, dc), (dr, dc)]
+            if cells[cell - dc] != FREE:
+                directions.append((dr, -dc))
+            if cells[cell - dr * stride] != FREE:
+                directions.append((-dr, dc))
+        elif dr:
+            directions = [(dr, 0)]
+            if cells[cell + 1] != FREE:
+                directions.append((dr, 1))
+            if cells[cell - 1] != FREE:
+                directions.append((dr, -1))
+        else:
+            directions = [(0, dc)]
+            if cells[cell + stride] != FREE:
+                directions.append((1, dc))
+            if cells[cell - stride] != FREE:
+                directions.append((-1, dc))
+        return directions
+    
+    def _jump_straight(self, cell: int, step: int, side: int, target: int) -> Tuple[int, int]:
+        """Walk from cell by step until a jump point; returns (jump point or -1, moves)
+        
+        side is the flat offset perpendicular to step.
+        """
+        cells = self.grid._cells
+        moves = 0
+        while True:
+            cell += step
+            moves += 1
+            if cells[cell] != FREE:
+                return -1, moves
+            if cell == target:
+                return cell, moves
+            # Forced neighbor: a blocked cell beside us with a free cell diagonally ahead of it
+            if ((cells[cell + side] != FREE and cells[cell + step + side] == FREE) or
+                    (cells[cell - side] != FREE and cells[cell + step - side] == FREE)):
+                return cell, moves
+    
+    def _jump(self, cell: int, dr: int, dc: int, target: int) -> Tuple[int, int]:
+        """Jump from cell in direction (dr, dc); returns (jump point or -1, moves)"""
+        stride = self.grid._stride
+        if not (dr and dc):
+            return self._jump_straight(cell, dr * stride + dc, 1 if dr else stride, target)
+        
+        cells = self.grid._cells
+        vertical = dr * stride
+        step = vertical + dc
+        moves = 0
+        while True:
+            cell += step
+            moves += 1
+            if cells[cell] != FREE:
+                return -1, moves
+            if cell == target:
+                return cell, moves
+            if ((cells[cell - dc] != FREE and cells[cell + vertical - dc] == FREE) or
+                    (cells[cell - vertical] != FREE and cells[cell - vertical + dc] == FREE)):
+                return cell, moves
+            # A diagonal cell is a jump point if a straight jump from it finds one
+            if (self._jump_straight(cell, vertical, 1, target)[0] >= 0 or
+                    self._jump_straight(cell, dc, stride, target)[0] >= 0):
+                return cell, moves
+    
+    def jps(self) -> bool:
+        """Jump Point Search"""
+        return self._run_steps(self.jps_steps())
+    
+    def jps_steps(self) -> Generator[None, None, bool]:
+        """Jump Point Search, yielding once per step (see stream())
+        
+        Uniform-cost search with the same move costs as ucs(), but runs of
+        symmetric moves through open space are skipped: each expansion jumps
+        straight or diagonally until it hits a forced neighbor or the target.
+        Only jump points enter the frontier and the trace. Diagonal moves may
+        cut corners, as in get_neighbors().
+        """
+        trace = self._new_trace()
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        jump = self._hooked(self._jump, "jump")
+        stride, cols = grid._stride, grid.cols
+        
+        def flat_id(cell: int) -> int:
+            """Unpadded id of a padded cell, as the trace expects"""
+            r, c = divmod(cell, stride)
+            return (r - 1) * cols + c - 1
+        
+        start = (grid.start[0] + 1) * stride + grid.start[1] + 1
+        target = (grid.target[0] + 1) * stride + grid.target[1] + 1
+        size = len(grid._cells)
+        
+        # Cells are padded flat ids, so heap ties still break in row-major order like ucs()
+        frontier = [(0.0, start)]
+        came_from = array('i', [-1]) * size  # Previous jump point
+        cost_so_far = array('d', [math.inf]) * size
+        cost_so_far[start] = 0.0
+        explored = bytearray(size)
+        
+        while frontier:
             # Spawn dynamic obstacle
-            obstacle = self.grid.spawn_dynamic_obstacle()
-            if obstacle:
-                self.dynamic_obstacle_spawned.append(len(self.frontier_history))
+            obstacle = spawn_obstacle()
             
             # Record current state
-            self.frontier_history.append([pos for pos, _ in stack])
-            self.explored_history.append(explored.copy())
+            if trace.begin_step(len(frontier), obstacle):
+                trace.checkpoint(flat_id(cell) for _, cell in frontier)
+            yield  # Step begun; a streaming caller may pause here
             
-            current, depth = stack.pop()
+            current_cost, current = heapq.heappop(frontier)
+            trace.pop(flat_id(current))
             
-            if current == self.grid.target:
-                self.path = self.reconstruct_path(came_from, current)
+            if current == target:
+                self.path = self._jump_point_path(came_from, current)
                 return True
             
-            if current in explored or depth >= limit:
+            if explored[current]:
                 continue
             
-            explored.add(current)
+            explored[current] = 1
+            trace.explore(flat_id(current))
             
-            if depth < limit:
-                neighbors = self.grid.get_neighbors(current)
-                for neighbor in reversed(neighbors):
-                    if neighbor not in explored:
-                        stack.append((neighbor, depth + 1))
-                        if neighbor not in came_from:
-                            came_from[neighbor] = current
+            for dr, dc in self._jps_directions(current, came_from[current]):
+                jump_point, moves = jump(current, dr, dc, target)
+                if jump_point < 0:
+                    continue
+                new_cost = current_cost + moves * grid.move_cost(dr, dc)
+                
+                if new_cost < cost_so_far[jump_point]:
+                    cost_so_far[jump_point] = new_cost
+                    heapq.heappush(frontier, (new_cost, jump_point))
+                    trace.push(flat_id(jump_point))
+                    came_from[jump_point] = current
         
         return False
     
+    def _jump_point_path(self, came_from: array, current: int) -> List[Tuple[int, int]]:
+        """Expand a chain of padded jump point ids into the full cell path"""
+        stride = self.grid._stride
+        jump_points = []
+        while current >= 0:
+            r, c = divmod(current, stride)
+            jump_points.append((r - 1, c - 1))
+            current = came_from[current]
+        jump_points.reverse()
+        
+        path = [jump_points[0]]
+        for r, c in jump_points[1:]:
+            pr, pc = path[-1]
+            dr = (r > pr) - (r < pr)
+            dc = (c > pc) - (c < pc)
+            while (pr, pc) != (r, c):
+                pr += dr
+                pc += dc
+                path.append((pr, pc))
+        return path
+    
+    def _depth_limited_round(self, trace, limit: int, best_depth: array,
+                             came_from: array) -> Generator[None, None, Tuple[bool, bool]]:
+        """One depth-limited DFS pass; the generator returns (found, cutoff)
+        
+        best_depth records the shallowest depth each cell was expanded at, so a
+        cell first reached along a long path is expanded again when a shorter
+        path reaches it. cutoff is True if any node was left unexpanded
+        because it sat at the depth limit. best_depth and came_from are
+        per-run arrays (see _depth_arrays()); the entries this round sets are
+        restored before it returns, so the next round can reuse them.
+        """
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        neighbor_ids = self._hooked(grid.neighbor_ids, "successors")
+        start, target = self._cell_id(grid.start), self._cell_id(grid.target)
+        # Stack: (cell, depth, parent)
+        stack = [(start, 0, -1)]
+        touched = []  # Cells whose best_depth / came_from entries were set
+        cut_cells = []  # Cells popped at the depth limit
+        steps = len(trace)
+        expansions = 0
+        found = False
+        
+        while stack:
+            # Spawn dynamic obstacle
+            obstacle = spawn_obstacle()
+            
+            # Record current state
+            if trace.begin_step(len(stack), obstacle):
+                trace.checkpoint(cell for cell, _, _ in stack)
+            yield  # Step begun; a streaming caller may pause here
+            
+            current, depth, parent = stack.pop()
+            trace.pop(current)
+            
+            if current == target:
+                came_from[current] = parent
+                touched.append(current)
+                self.path = self._parent_path(came_from, current)
+                found = True
+                break
+            
+            if depth >= best_depth[current]:
+                # Already expanded at this depth or shallower
+                continue
+            
+            if depth >= limit:
+                cut_cells.append(current)
+                continue
+            
+            best_depth[current] = depth
+            came_from[current] = parent
+            touched.append(current)
+            trace.explore(current)
+            expansions += 1
+            
+            # Expanded cells sit below the limit, so every push is within it
+            for neighbor in reversed(neighbor_ids(current)):
+                if depth + 1 < best_depth[neighbor]:
+                    stack.append((neighbor, depth + 1, current))
+                    trace.push(neighbor)
+        
+        # A cell popped at the limit but later expanded through a shorter path
+        # was not really cut off
+        cutoff = any(best_depth[cell] == _UNSET_DEPTH for cell in cut_cells)
+        for cell in touched:
+            best_depth[cell] = _UNSET_DEPTH
+            came_from[cell] = -1
+        self.round_stats.append({
+            "depth_limit": limit,
+            "steps": len(trace) - steps,
+            "expansions": expansions,
+            "cutoff": cutoff,
+            "found": found,
+        })
+        return found, cutoff
+    
+    def _depth_arrays(self) -> Tuple[array, array]:
+        """Fresh (best_depth, came_from) arrays for _depth_limited_round()"""
+        size = self.grid.rows * self.grid.cols
+        return array('i', [_UNSET_DEPTH]) * size, array('i', [-1]) * size
+    
+    def dls(self, limit: int = config.DEPTH_LIMIT) -> bool:
+        """Depth-Limited Search"""
+        return self._run_steps(self.dls_steps(limit))
+    
+    def dls_steps(self, limit: int = config.DEPTH_LIMIT) -> Generator[None, None, bool]:
+        """Depth-Limited Search, yielding once per step (see stream())"""
+        trace = self._new_trace()
+        self.round_stats = []
+        found, _ = yield from self._depth_limited_round(trace, limit, *self._depth_arrays())
+        return found
+    
     def iddfs(self) -> bool:
         """Iterative Deepening Depth-First Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+        return self._run_steps(self.iddfs_steps())
+    
+    def iddfs_steps(self) -> Generator[None, None, bool]:
+        """Iterative Deepening Depth-First Search, yielding once per step (see stream())
         
+        Stops as soon as a round finishes without cutting anything off at
+        its depth limit: a deeper round could not reach any new cell.
+        Per-round statistics are left in self.round_stats.
+        """
+        trace = self._new_trace()
+        self.round_stats = []
         max_depth = self.grid.rows * self.grid.cols
+        best_depth, came_from = self._depth_arrays()  # Shared by all rounds
         
         for depth_limit in range(max_depth):
+            if depth_limit > 0:
+                trace.reset()
+                trace.push(self._cell_id(self.grid.start))
+            
             # Perform DLS at current depth
-            stack = [(self.grid.start, 0)]
-            came_from = {}
-            explored = set()
-            
-            while stack:
-                # Spawn dynamic obstacle
-                obstacle = self.grid.spawn_dynamic_obstacle()
-                if obstacle:
-                    self.dynamic_obstacle_spawned.append(len(self.frontier_history))
-                
-                # Record current state
-                self.frontier_history.append([pos for pos, _ in stack])
-                self.explored_history.append(explored.copy())
-                
-                current, depth = stack.pop()
-                
-                if current == self.grid.target:
-                    self.path = self.reconstruct_path(came_from, current)
-                    return True
-                
-                if current in explored or depth >= depth_limit:
-                    continue
-                
-                explored.add(current)
-                
-                if depth < depth_limit:
-                    neighbors = self.grid.get_neighbors(current)
-                    for neighbor in reversed(neighbors):
-                        if neighbor not in explored:
-                            stack.append((neighbor, depth + 1))
-                            if neighbor not in came_from:
-                                came_from[neighbor] = current
+            found, cutoff = yield from self._depth_limited_round(trace, depth_limit, best_depth, came_from)
+            if found:
+                return True
+            if not cutoff:
+                return False
         
         return False
     
+    def _join_bidirectional_path(self, parents_forward: array, parents_backward: array,
+                                 meeting: int) -> List[Tuple[int, int]]:
+        """Join start -> meeting (forward parents) with meeting -> target (backward parents)"""
+        path = self._parent_path(parents_forward, meeting)
+        path.extend(reversed(self._parent_path(parents_backward, parents_backward[meeting])))
+        return path
+    
     def bidirectional_search(self) -> bool:
         """Bidirectional Search"""
-        self.frontier_history = []
-        self.explored_history = []
-        self.dynamic_obstacle_spawned = []
+        return self._run_steps(self.bidirectional_search_steps())
+    
+    def bidirectional_search_steps(self) -> Generator[None, None, bool]:
+        """Bidirectional Search, yielding once per step (see stream())
         
-        # Forward search from start
-        queue_forward = deque([self.grid.start])
-        came_from_forward = {}
-        explored_forward = set()
+        Each step expands one node from whichever side has the smaller
+        frontier, and the searches meet as soon as one side generates a cell
+        the other side has already reached.
+        """
+        trace = self._new_trace()
+        grid = self.grid
+        spawn_obstacle = self._hooked(grid.spawn_dynamic_obstacle, "spawn")
+        neighbor_ids = self._hooked(grid.neighbor_ids, "successors")
+        start, target = self._cell_id(grid.start), self._cell_id(grid.target)
+        size = grid.rows * grid.cols
         
-        # Backward search from target
-        queue_backward = deque([self.grid.target])
-        came_from_backward = {}
-        explored_backward = set()
+        # Parent arrays double as the set of cells each side has reached
+        # (queued or explored): -2 is unreached, -1 marks the side's root
+        queue_forward = deque([start])
+        parents_forward = array('i', [-2]) * size
+        parents_forward[start] = -1
+        queue_backward = deque([target])
+        parents_backward = array('i', [-2]) * size
+        parents_backward[target] = -1
+        
+        if start == target:
+            trace.begin_step(1)
+            trace.checkpoint([start])
+            yield
+            self.path = [grid.start]
+            return True
         
         while queue_forward and queue_backward:
             # Spawn dynamic obstacle
-            obstacle = self.grid.spawn_dynamic_obstacle()
-            if obstacle:
-                self.dynamic_obstacle_spawned.append(len(self.frontier_history))
-            
-            # Record current state (combine both frontiers)
-            combined_frontier = list(queue_forward) + list(queue_backward)
-            combined_explored = explored_forward.union(explored_backward)
-            self.frontier_history.append(combined_frontier)
-            self.explored_history.append(combined_explored)
-            
-            # Expand forward
-            if queue_forward:
-                current_f = queue_forward.popleft()
-                
-                if current_f in explored_backward:
-                    # Found intersection!
-                    path_forward = self.reconstruct_path(came_from_forward, current_f)
-                    path_backward = self.reconstruct_path(came_from_backward, current_f)
-                    path_backward.reverse()
-                    self.path = path_forward[:-1] + path_backward
-                    return True
-                
-                if current_f not in explored_forward:
-                    explored_forward.add(current_f)
-                    for neighbor in self.grid.get_neighbors(current_f):
-                        if neighbor not in explored_forward and neighbor not in queue_forward:
-                            queue_forward.append(neighbor)
-                            came_from_forward[neighbor] = current_f
-            
-            # Expand backward
-            if queue_backward:
-                current_b = queue_backward.popleft()
-                
-                if current_b in explored_forward:
+            obstacle = spawn_obstacle()
+            
+            # Record current state (the trace merges both frontiers and explored sets)
+            if trace.begin_step(len(queue_forward) + len(queue_backward), obstacle):
+                trace.checkpoint(chain(queue_forward, queue_backward))
+            yield  # Step begun; a streaming caller may pause here
+            
+            # Expand the smaller frontier
+            if len(queue_forward) <= len(queue_backward):
+                queue, parents, other_parents = queue_forward, parents_forward, parents_backward
+            else:
+                queue, parents, other_parents = queue_backward, parents_backward, parents_forward
+            
+            current = queue.popleft()
+            trace.pop(current)
+            trace.explore(current)
+            
+            for neighbor in neighbor_ids(current):
+                if parents[neighbor] != -2:
+                    continue
+                parents[neighbor] = current
+                if other_parents[neighbor] != -2:
                     # Found intersection!
-                    path_forward = self.reconstruct_path(came_from_forward, current_b)
-                    path_backward = self.reconstruct_path(came_from_backward, current_b)
-                    path_backward.reverse()
-                    self.path = path_forward[:-1] + path_backward
+                    self.path = self._join_bidirectional_path(parents_forward, parents_backward, neighbor)
                     return True
-                
-                if current_b not in explored_backward:
-                    explored_backward.add(current_b)
-                    for neighbor in self.grid.get_neighbors(current_b):
-                        if neighbor not in explored_backward and neighbor not in queue_backward:
-                            queue_backward.append(neighbor)
-                            came_from_backward[neighbor] = current_b
+                queue.append(neighbor)
+                trace.push(neighbor)
         
         return False
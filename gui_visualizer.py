@@ -3,12 +3,34 @@ GUI Visualizer using Pygame - Modern Pinterest Style
 Provides real-time step-by-step visualization with beautiful card-based design
 """
 
+import argparse
 import pygame
 import sys
 import time
+from collections import Counter, deque
+from itertools import chain
 from typing import Optional
+import numpy as np
 import config
-from grid_environment import GridEnvironment, SearchAlgorithms
+from grid_environment import DYNAMIC_OBSTACLE, WALL, GridEnvironment, SearchAlgorithms
+from search_trace import PUSH, POP, EXPLORE, RESET, SearchStep
+from search_worker import SearchWorker
+from trace_file import TraceReader, TraceReplay
+
+# Rendered cell states, in priority order of the checks in cell_state()
+CELL_EMPTY, CELL_START, CELL_TARGET, CELL_WALL, CELL_OBSTACLE, CELL_PATH, CELL_FRONTIER, CELL_EXPLORED = range(8)
+
+# Cell state -> color
+STATE_COLORS = [
+    config.COLOR_CARD_BG,
+    config.COLOR_START,
+    config.COLOR_TARGET,
+    config.COLOR_WALL,
+    config.COLOR_DYNAMIC_OBSTACLE,
+    config.COLOR_PATH,
+    config.COLOR_FRONTIER,
+    config.COLOR_EXPLORED,
+]
 
 def draw_rounded_rect(surface, color, rect, radius=10):
     """Draw a rounded rectangle"""
@@ -59,7 +81,7 @@ class ModernButton:
 class GUIVisualizer:
     """Main GUI class with modern Pinterest-style design"""
     
-    def __init__(self):
+    def __init__(self, render_mode: str = config.RENDER_MODE):
         pygame.init()
         self.screen = pygame.display.set_mode((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
         pygame.display.set_caption("GOOD PERFORMANCE TIME APP")
@@ -71,11 +93,35 @@ class GUIVisualizer:
         self.small_font = pygame.font.Font(None, 20)
         self.tiny_font = pygame.font.Font(None, 16)
         
-        # Grid and algorithms
+        # Grid and algorithms; the GUI streams steps, so no history is recorded
         self.grid = GridEnvironment()
-        self.search = SearchAlgorithms(self.grid)
+        self.search = SearchAlgorithms(self.grid, record_trace=False)
+        
+        # Visualization state, advanced one streamed step at a time
+        self.worker = None  # Step source of the running search: SearchWorker, or TraceReplay for trace files
+        self.frontier = Counter()  # Frontier multiset after the latest step
+        self.explored = set()
+        self.path_cells = set()  # Final path, filled when the search completes
         
-        # Visualization state
+        # Rendering mode: rounded rect per cell, or one pixel per cell scaled through pygame.surfarray
+        if render_mode == "auto":
+            render_mode = "cells" if config.GRID_SCALE == config.CELL_SIZE else "array"
+        if render_mode not in ("cells", "array"):
+            raise ValueError(f"Unknown render mode: {render_mode}")
+        if render_mode == "cells" and config.GRID_SCALE < config.CELL_SIZE:
+            raise ValueError("Grid too large for cell rendering, use the array render mode")
+        self.render_mode = render_mode
+        
+        # Cached rendering: static layer (card, walls, start, target) and the grid layer drawn over it
+        self.static_layer = None
+        self.grid_layer = None  # Rebuilt from scratch when None
+        self.drawn_colors = {}  # Cell -> color currently on the grid layer (missing means background)
+        self.dirty_cells = set()  # Cells that may have changed since the last frame
+        self.changed_cells = deque()  # Flat ids from the grid listener; filled by the worker thread
+        self.cell_states = None  # Array mode: (cols, rows) uint8 CELL_* states, x-major like surfarray
+        self.cell_pixels = None  # Array mode: one pixel per cell, scaled onto the grid layer
+        self.pixel_palette = None  # Array mode: STATE_COLORS mapped to cell_pixels' pixel format
+        self.grid.add_change_listener(self.on_cells_changed)
         self.current_step = 0
         self.is_running = False
         self.is_complete = False
@@ -95,64 +141,172 @@ class GUIVisualizer:
             'next_algo': ModernButton(start_x + 2 * (button_width + button_spacing), button_y, button_width, button_height, '→ Next', config.COLOR_ACCENT),
             'speed_up': ModernButton(start_x + 3 * (button_width + button_spacing), button_y, 80, button_height, '⚡ Fast', (52, 211, 153)),
             'slow_down': ModernButton(start_x + 3 * (button_width + button_spacing) + 95, button_y, 80, button_height, '🐢 Slow', (251, 146, 60)),
+            'cancel': ModernButton(start_x + 3 * (button_width + button_spacing) + 190, button_y, 80, button_height, '■ Stop', (100, 116, 139)),
         }
         
         self.last_update_time = time.time()
     
+    def cell_state(self, pos):
+        """CELL_* state of one cell in the current visualization state"""
+        if pos == self.grid.start:
+            return CELL_START
+        elif pos == self.grid.target:
+            return CELL_TARGET
+        elif pos in self.grid.walls:
+            return CELL_WALL
+        elif pos in self.grid.dynamic_obstacles:
+            return CELL_OBSTACLE
+        elif pos in self.path_cells:
+            return CELL_PATH
+        elif self.is_running and pos in self.frontier:  # The frontier is hidden once the search is over
+            return CELL_FRONTIER
+        elif pos in self.explored:
+            return CELL_EXPLORED
+        return CELL_EMPTY
+    
+    def cell_color(self, pos):
+        """Color of one cell in the current visualization state"""
+        return STATE_COLORS[self.cell_state(pos)]
+    
+    def build_grid_layers(self):
+        """Render the grid card, walls, start and target once to the cached static layer"""
+        # Layer covers the card plus its shadow; cells start 10px inside the card
+        self.static_layer = pygame.Surface((config.GRID_WIDTH + 24, config.GRID_HEIGHT + 24))
+        self.static_layer.fill(config.COLOR_BACKGROUND)
+        draw_card(self.static_layer, 0, 0, config.GRID_WIDTH + 20, config.GRID_HEIGHT + 20)
+        self.dirty_cells = set(chain(self.frontier, self.explored, self.path_cells))
+        if self.render_mode == "array":
+            self.build_cell_states()
+            return
+        
+        static_colors = {pos: self.cell_color(pos) for pos in chain(self.grid.walls, (self.grid.start, self.grid.target))}
+        for pos, color in static_colors.items():
+            self.draw_cell(self.static_layer, pos, color)
+        
+        # Cells on the grid layer are redrawn over the static layer when they change
+        self.grid_layer = self.static_layer.copy()
+        self.drawn_colors = static_colors
+        self.dirty_cells.update(self.grid.dynamic_obstacles)
+    
+    def build_cell_states(self):
+        """Array mode: fill the whole state array from the occupancy grid in one pass"""
+        occupancy = self.grid.occupancy[1:-1, 1:-1].T
+        self.cell_states = np.full(occupancy.shape, CELL_EMPTY, dtype=np.uint8)
+        self.cell_states[occupancy == WALL] = CELL_WALL
+        self.cell_states[occupancy == DYNAMIC_OBSTACLE] = CELL_OBSTACLE
+        for pos in (self.grid.start, self.grid.target):
+            self.cell_states[pos[1], pos[0]] = self.cell_state(pos)
+        
+        self.grid_layer = self.static_layer.copy()
+        self.cell_pixels = pygame.Surface(self.cell_states.shape, depth=32)
+        self.pixel_palette = np.array([self.cell_pixels.map_rgb(color) for color in STATE_COLORS], dtype=np.uint32)
+        self.dirty_cells.add(self.grid.start)  # Forces the first upload
+    
+    def cell_rect(self, pos):
+        """Cell rectangle in grid layer coordinates"""
+        r, c = pos
+        return pygame.Rect(10 + c * config.CELL_SIZE, 10 + r * config.CELL_SIZE, config.CELL_SIZE, config.CELL_SIZE)
+    
+    def draw_cell(self, surface, pos, color):
+        """Draw one cell with slight rounding"""
+        draw_rounded_rect(surface, color, self.cell_rect(pos).inflate(-2, -2), 4)
+    
+    def on_cells_changed(self, cells):
+        """Grid change listener: walls or dynamic obstacles changed on these flat cell ids
+        
+        Called from the search worker thread, so the cells are only queued
+        here and handled by the next draw_grid().
+        """
+        self.changed_cells.extend(cells)
+    
+    def apply_cell_changes(self):
+        """Mark cells reported by the grid listener dirty"""
+        cells = []
+        while self.changed_cells:
+            cells.append(divmod(self.changed_cells.popleft(), self.grid.cols))
+        if any(pos in self.grid.walls or self.drawn_colors.get(pos) == config.COLOR_WALL for pos in cells):
+            self.grid_layer = None  # Walls live on the static layer
+        self.mark_dirty(cells)
+    
+    def mark_dirty(self, cells):
+        """Queue cells to be redrawn on the next frame"""
+        self.dirty_cells.update(cells)
+    
     def draw_grid(self):
-        """Draw the grid with modern styling"""
-        grid_x = 30
-        grid_y = 100
-        grid_width = config.GRID_COLS * config.CELL_SIZE
-        grid_height = config.GRID_ROWS * config.CELL_SIZE
-        
-        # Draw card background for grid
-        draw_card(self.screen, grid_x - 10, grid_y - 10, grid_width + 20, grid_height + 20)
-        
-        # Get current visualization state
-        frontier = set()
-        explored = set()
-        
-        if self.is_running and self.current_step < len(self.search.frontier_history):
-            frontier = set(self.search.frontier_history[self.current_step])
-            explored = set(self.search.explored_history[self.current_step])
-        elif self.is_complete:
-            if len(self.search.explored_history) > 0:
-                explored = set(self.search.explored_history[-1])
-        
-        # Draw cells with rounded corners
-        for r in range(config.GRID_ROWS):
-            for c in range(config.GRID_COLS):
-                pos = (r, c)
-                x = grid_x + c * config.CELL_SIZE
-                y = grid_y + r * config.CELL_SIZE
-                
-                # Determine cell color
-                if pos == self.grid.start:
-                    color = config.COLOR_START
-                elif pos == self.grid.target:
-                    color = config.COLOR_TARGET
-                elif pos in self.grid.walls:
-                    color = config.COLOR_WALL
-                elif pos in self.grid.dynamic_obstacles:
-                    color = config.COLOR_DYNAMIC_OBSTACLE
-                elif self.is_complete and pos in self.search.path:
-                    color = config.COLOR_PATH
-                elif pos in frontier:
-                    color = config.COLOR_FRONTIER
-                elif pos in explored:
-                    color = config.COLOR_EXPLORED
+        """Draw the grid with modern styling
+        
+        Only cells whose color changed since the last frame are redrawn on the
+        cached grid layer, which is then blitted in one go.
+        """
+        self.apply_cell_changes()
+        if self.grid_layer is None:
+            self.build_grid_layers()
+        if self.render_mode == "array":
+            self.draw_cell_array()
+        
+        for pos in self.dirty_cells:
+            color = self.cell_color(pos)
+            if self.drawn_colors.get(pos, config.COLOR_CARD_BG) == color:
+                continue
+            rect = self.cell_rect(pos)
+            self.grid_layer.blit(self.static_layer, rect, rect)
+            if color != config.COLOR_CARD_BG:
+                self.draw_cell(self.grid_layer, pos, color)
+            self.drawn_colors[pos] = color
+        self.dirty_cells.clear()
+        
+        self.screen.blit(self.grid_layer, (20, 90))
+    
+    def draw_cell_array(self):
+        """Array mode: write dirty cell states, then recolor and scale the whole grid at once
+        
+        The state array goes through the palette in one vectorized lookup and
+        is uploaded with pygame.surfarray, so the cost per frame does not
+        depend on how many cells changed.
+        """
+        if not self.dirty_cells:
+            return
+        cols, rows = zip(*((c, r) for r, c in self.dirty_cells))
+        self.cell_states[cols, rows] = [self.cell_state(pos) for pos in self.dirty_cells]
+        self.dirty_cells.clear()
+        
+        pygame.surfarray.blit_array(self.cell_pixels, self.pixel_palette[self.cell_states])
+        grid_area = self.grid_layer.subsurface((10, 10, config.GRID_WIDTH, config.GRID_HEIGHT))
+        pygame.transform.scale(self.cell_pixels, grid_area.get_size(), grid_area)
+        
+        # Start and target stay visible even when a cell is smaller than a pixel
+        for pos in (self.grid.start, self.grid.target):
+            r, c = pos
+            marker = pygame.Rect(0, 0, 6, 6)
+            marker.center = (10 + int((c + 0.5) * config.GRID_WIDTH / self.grid.cols),
+                             10 + int((r + 0.5) * config.GRID_HEIGHT / self.grid.rows))
+            draw_rounded_rect(self.grid_layer, self.cell_color(pos), marker, 3)
+    
+    def apply_step(self, step: SearchStep):
+        """Advance the frontier and explored sets by one streamed step"""
+        frontier = self.frontier
+        for kind, pos in step.events:
+            if pos is not None:
+                self.dirty_cells.add(pos)
+            if kind == PUSH:
+                frontier[pos] += 1
+            elif kind == POP:
+                if frontier[pos] <= 1:
+                    del frontier[pos]
                 else:
-                    color = config.COLOR_CARD_BG
-                
-                # Draw cell with slight rounding
-                cell_rect = pygame.Rect(x + 1, y + 1, config.CELL_SIZE - 2, config.CELL_SIZE - 2)
-                draw_rounded_rect(self.screen, color, cell_rect, 4)
+                    frontier[pos] -= 1
+            elif kind == EXPLORE:
+                self.explored.add(pos)
+            elif kind == RESET:
+                self.mark_dirty(chain(frontier, self.explored))
+                frontier.clear()
+                self.explored.clear()
+        self.current_step = step.index + 1
     
     def draw_header(self):
         """Draw modern header with algorithm name"""
         # Header card
-        header_card = draw_card(self.screen, 30, 20, config.GRID_COLS * config.CELL_SIZE + 20, 60)
+        header_card = draw_card(self.screen, 30, 20, config.GRID_WIDTH + 20, 60)
         
         # Algorithm name
         algo_text = config.ALGORITHMS[self.selected_algorithm]
@@ -162,7 +316,7 @@ class GUIVisualizer:
     
     def draw_stats_panel(self):
         """Draw statistics panel with modern card design"""
-        panel_x = config.GRID_COLS * config.CELL_SIZE + 80
+        panel_x = config.GRID_WIDTH + 80
         panel_y = 100
         panel_width = 320
         
@@ -178,31 +332,26 @@ class GUIVisualizer:
         
         if self.is_running or self.is_complete:
             # Current step
-            step_text = f"Step: {self.current_step}/{len(self.search.frontier_history)}"
+            step_text = f"Step: {self.current_step}"
             text_surface = self.small_font.render(step_text, True, config.COLOR_TEXT)
             self.screen.blit(text_surface, (panel_x + 20, y_offset))
             y_offset += 30
             
             # Nodes explored
-            if self.current_step < len(self.search.explored_history):
-                explored_count = len(self.search.explored_history[self.current_step])
-            else:
-                explored_count = len(self.search.explored_history[-1]) if self.search.explored_history else 0
-            
-            explored_text = f"Explored: {explored_count} nodes"
+            explored_text = f"Explored: {len(self.explored)} nodes"
             text_surface = self.small_font.render(explored_text, True, config.COLOR_TEXT)
             self.screen.blit(text_surface, (panel_x + 20, y_offset))
             y_offset += 30
             
             # Path length
-            if self.is_complete and self.search.path:
-                path_text = f"Path Length: {len(self.search.path)}"
+            if self.is_complete and self.path_cells:
+                path_text = f"Path Length: {len(self.path_cells)}"
                 text_surface = self.small_font.render(path_text, True, config.COLOR_ACCENT)
                 self.screen.blit(text_surface, (panel_x + 20, y_offset))
                 y_offset += 30
         
         # Speed indicator
-        speed_text = f"Speed: {self.animation_speed:.3f}s"
+        speed_text = f"Speed: {self.animation_speed:.3g}s"
         text_surface = self.small_font.render(speed_text, True, config.COLOR_TEXT)
         self.screen.blit(text_surface, (panel_x + 20, y_offset))
         
@@ -252,12 +401,14 @@ class GUIVisualizer:
                 if button.handle_event(event):
                     if name == 'run':
                         self.run_algorithm()
+                    elif name == 'cancel':
+                        self.cancel_search()
                     elif name == 'reset':
                         self.reset()
                     elif name == 'next_algo':
                         self.next_algorithm()
                     elif name == 'speed_up':
-                        self.animation_speed = max(0.001, self.animation_speed / 2)
+                        self.animation_speed = max(config.MIN_ANIMATION_DELAY, self.animation_speed / 2)
                     elif name == 'slow_down':
                         self.animation_speed = min(1.0, self.animation_speed * 2)
         
@@ -271,33 +422,61 @@ class GUIVisualizer:
         # Reset grid dynamic obstacles
         self.grid.reset_dynamic_obstacles()
         
-        # Run the selected algorithm
+        # Run the selected algorithm in the background; steps are animated as they arrive
+        self.start_animation(SearchWorker(self.search, config.ALGORITHM_METHODS[self.selected_algorithm]).start())
+    
+    def replay(self, trace_path):
+        """Replay a recorded trace file; steps are read from its memory map as they are animated"""
+        self.cancel_search()
+        reader = TraceReader(trace_path)
+        if reader.algorithm in config.ALGORITHM_METHODS:
+            self.selected_algorithm = config.ALGORITHM_METHODS.index(reader.algorithm)
+        if (reader.rows, reader.cols) != (config.GRID_ROWS, config.GRID_COLS):
+            self.render_mode = "array"  # Only array rendering scales to any grid size
+        self.set_grid(reader.grid())
+        self.start_animation(TraceReplay(reader, self.grid))
+    
+    def start_animation(self, worker):
+        """Clear the visualization state and animate the steps of worker"""
         self.is_running = True
         self.is_complete = False
         self.current_step = 0
-        
-        algorithm_methods = [
-            self.search.bfs,
-            self.search.dfs,
-            self.search.ucs,
-            self.search.dls,
-            self.search.iddfs,
-            self.search.bidirectional_search
-        ]
-        
-        success = algorithm_methods[self.selected_algorithm]()
-        
-        if not success:
-            print(f"Algorithm {config.ALGORITHMS[self.selected_algorithm]} failed to find a path!")
+        self.frontier = Counter()
+        self.explored = set()
+        self.path_cells = set()
+        self.grid_layer = None
+        self.worker = worker
+    
+    def cancel_search(self):
+        """Stop the running search; what was animated so far stays on screen"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+        if self.is_running:
+            self.is_running = False
+            self.mark_dirty(self.frontier)
+            print(f"Algorithm {config.ALGORITHMS[self.selected_algorithm]} cancelled after {self.current_step} steps")
     
     def reset(self):
         """Reset the visualization"""
-        self.grid = GridEnvironment()
-        self.search = SearchAlgorithms(self.grid)
+        self.cancel_search()
+        self.set_grid(GridEnvironment())
+        self.frontier = Counter()
+        self.explored = set()
+        self.path_cells = set()
+        self.grid_layer = None
         self.current_step = 0
         self.is_running = False
         self.is_complete = False
     
+    def set_grid(self, grid):
+        """Show and search a new grid"""
+        self.grid = grid
+        self.grid.add_change_listener(self.on_cells_changed)
+        self.search = SearchAlgorithms(self.grid, record_trace=False)
+        self.changed_cells.clear()
+        self.grid_layer = None
+    
     def next_algorithm(self):
         """Switch to the next algorithm"""
         self.selected_algorithm = (self.selected_algorithm + 1) % len(config.ALGORITHMS)
@@ -307,13 +486,35 @@ class GUIVisualizer:
         """Update the visualization state"""
         if self.is_running and not self.is_complete:
             current_time = time.time()
-            if current_time - self.last_update_time >= self.animation_speed:
+            due = int((current_time - self.last_update_time) / max(self.animation_speed, config.MIN_ANIMATION_DELAY))
+            if due:
                 self.last_update_time = current_time
-                self.current_step += 1
+                # Apply the steps that fell due since the last frame and are ready, within the frame's time budget
+                deadline = time.perf_counter() + config.STEP_TIME_BUDGET
+                step = None
+                for _ in range(due):
+                    ready = self.worker.poll(1)
+                    if not ready:
+                        break
+                    step = ready[0]
+                    self.apply_step(step)
+                    if step.done or time.perf_counter() > deadline:
+                        break
                 
-                if self.current_step >= len(self.search.frontier_history):
+                if (step is not None and step.done) or self.worker.finished:
                     self.is_complete = True
                     self.is_running = False
+                    error = self.worker.error
+                    path = self.worker.path
+                    self.worker = None
+                    self.mark_dirty(self.frontier)
+                    if step is not None and step.success:
+                        self.path_cells = set(path)
+                        self.mark_dirty(self.path_cells)
+                    elif error is not None:
+                        print(f"Algorithm {config.ALGORITHMS[self.selected_algorithm]} stopped with an error: {error!r}")
+                    else:
+                        print(f"Algorithm {config.ALGORITHMS[self.selected_algorithm]} failed to find a path!")
     
     def run(self):
         """Main game loop"""
@@ -332,10 +533,17 @@ class GUIVisualizer:
             pygame.display.flip()
             self.clock.tick(config.FPS)
         
+        self.cancel_search()
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Pathfinder GUI")
+    parser.add_argument("--replay", metavar="TRACE", help="Replay a trace file written by trace_file.py")
+    args = parser.parse_args()
+    
     visualizer = GUIVisualizer()
+    if args.replay:
+        visualizer.replay(args.replay)
     visualizer.run()
@@ -0,0 +1,370 @@
+"""
+Hierarchical Pathfinding
+HPA*-style abstraction of a GridEnvironment: clusters, entrances between
+them and intra-cluster costs, searched first on the small abstract graph
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from grid_environment import FREE, GridEnvironment
+
+INF = math.inf
+
+# Two crossing runs at least this wide get an entrance at both ends instead of one in the middle
+WIDE_ENTRANCE = 6
+
+
+class Cluster:
+    """Abstract nodes of one cluster and the costs between them"""
+    
+    def __init__(self, nodes: List[int], inter: Dict[int, List[Tuple[int, float]]], costs: np.ndarray):
+        self.nodes = nodes  # Entrance cells (flat ids) inside the cluster
+        self.inter = inter  # node -> [(cell across the border, move cost)]
+        self.costs = costs  # costs[i, j]: cheapest in-cluster path nodes[i] -> nodes[j] (inf if none)
+        self.index = {node: i for i, node in enumerate(nodes)}
+
+
+class HierarchicalPlanner:
+    """Near-optimal paths on very large grids through a two-level search
+    
+    The grid is cut into cluster_size x cluster_size clusters. Entrances are
+    picked on every border between two 8-adjacent clusters, one per group of
+    crossings joining the same free runs on both sides (two for wide
+    groups). A query connects start and target to the entrances of their own
+    clusters, runs A* over entrances, then refines each abstract edge into
+    cells with a search confined to one cluster.
+    
+    Cluster data is built on first use (precompute() builds everything up
+    front). When walls or dynamic obstacles change, only the clusters
+    containing changed cells are recomputed; their neighbors just refresh
+    the shared entrances and keep their costs if their entrances did not
+    move. Move costs match ucs(): 1 straight, 1.414 diagonal.
+    """
+    
+    def __init__(self, grid: GridEnvironment, cluster_size: int = 32):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_cols = -(-grid.cols // cluster_size)
+        self.path = []
+        self.clusters_built = 0  # Intra-cluster cost computations so far
+        self.abstract_expansions = 0  # Abstract nodes expanded by the last find_path()
+        self._moves = [((dr, dc), grid.move_cost(dr, dc)) for dr, dc in config.DIRECTIONS]
+        self._clusters: Dict[Tuple[int, int], Cluster] = {}
+        self._borders: Dict[Tuple, List[Tuple[int, int, float]]] = {}
+        self._stale = set()  # Clusters whose entrances must be refreshed
+        self._dirty = set()  # Clusters whose cells changed, so their costs must be recomputed
+        grid.add_change_listener(self._on_cells_changed)
+    
+    def close(self):
+        """Stop listening to grid changes"""
+        self.grid.remove_change_listener(self._on_cells_changed)
+    
+    def _on_cells_changed(self, cells: List[int]):
+        cols, size = self.grid.cols, self.cluster_size
+        touched = {((cell // cols) // size, (cell % cols) // size) for cell in cells}
+        for ci, cj in touched:
+            self._dirty.add((ci, cj))
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    other = (ci + di, cj + dj)
+                    self._stale.add(other)
+                    self._borders.pop(self._border_key((ci, cj), other), None)
+    
+    def cluster_of(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return (pos[0] // self.cluster_size, pos[1] // self.cluster_size)
+    
+    def _bounds(self, cluster: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Row range and column range [r0, r1) x [c0, c1) of a cluster"""
+        size = self.cluster_size
+        ci, cj = cluster
+        return (ci * size, min((ci + 1) * size, self.grid.rows),
+                cj * size, min((cj + 1) * size, self.grid.cols))
+    
+    @staticmethod
+    def _border_key(a: Tuple[int, int], b: Tuple[int, int]) -> Tuple:
+        return (a, b) if a <= b else (b, a)
+    
+    def _free(self, r: int, c: int) -> bool:
+        grid = self.grid
+        return grid._cells[(r + 1) * grid._stride + c + 1] == FREE
+    
+    # ---- Entrances ----
+    
+    def _border(self, a: Tuple[int, int], b: Tuple[int, int]) -> List[Tuple[int, int, float]]:
+        """Entrance edges (cell in the lower-keyed cluster, cell across, cost) between two clusters"""
+        key = self._border_key(a, b)
+        edges = self._borders.get(key)
+        if edges is None:
+            edges = self._find_entrances(*key)
+            self._borders[key] = edges
+        return edges
+    
+    def _find_entrances(self, a: Tuple[int, int], b: Tuple[int, int]) -> List[Tuple[int, int, float]]:
+        cols = self.grid.cols
+        ar0, ar1, ac0, ac1 = self._bounds(a)
+        di, dj = b[0] - a[0], b[1] - a[1]
+        
+        if di and dj:
+            # Corner crossing: a single diagonal move between the touching corner cells
+            r = ar1 - 1
+            c = ac1 - 1 if dj == 1 else ac0
+            if self._free(r, c) and self._free(r + 1, c + dj):
+                return [(r * cols + c, (r + 1) * cols + c + dj, config.DIAGONAL_MOVE_COST)]
+            return []
+        
+        # Side border: walk along it with (row, col) of the cell on a's side
+        if di:
+            line = [(ar1 - 1, c) for c in range(ac0, ac1)]
+            across = (1, 0)
+        else:
+            line = [(r, ac1 - 1) for r in range(ar0, ar1)]
+            across = (0, 1)
+        near = [self._free(r, c) for r, c in line]
+        far = [self._free(r + across[0], c + across[1]) for r, c in line]
+        
+        def runs(free: List[bool]) -> List[int]:
+            """Label contiguous free runs along the border (-1 for blocked cells)"""
+            labels, run = [], -1
+            for i, ok in enumerate(free):
+                if ok and (i == 0 or not free[i - 1]):
+                    run += 1
+                labels.append(run if ok else -1)
+            return labels
+        
+        near_runs, far_runs = runs(near), runs(far)
+        
+        # Crossings that join the same pair of runs are interchangeable
+        groups: Dict[Tuple[int, int], Tuple[List, List]] = {}
+        for i in range(len(line)):
+            if not near[i]:
+                continue
+            for shift in (0, -1, 1):
+                j = i + shift
+                if 0 <= j < len(line) and far[j]:
+                    straight, diagonal = groups.setdefault((near_runs[i], far_runs[j]), ([], []))
+                    (straight if shift == 0 else diagonal).append((i, j))
+        
+        edges = []
+        for straight, diagonal in groups.values():
+            if len(straight) >= WIDE_ENTRANCE:
+                chosen = [straight[0], straight[-1]]
+            elif straight:
+                chosen = [straight[len(straight) // 2]]
+            else:
+                chosen = [diagonal[0]]
+            for i, j in chosen:
+                (r, c), (fr, fc) = line[i], line[j]
+                fr, fc = fr + across[0], fc + across[1]
+                edges.append((r * cols + c, fr * cols + fc, self.grid.move_cost(fr - r, fc - c)))
+        return edges
+    
+    # ---- Clusters ----
+    
+    def _distances(self, bounds: Tuple[int, int, int, int], sources: List[int],
+                   dtype=np.float32) -> np.ndarray:
+        """Cheapest costs inside bounds from each source to every cell there, shape (sources, h, w)
+        
+        All sources relax together: each round takes the minimum over the 8
+        shifted cost arrays until nothing improves. Sources must be free;
+        float32 keeps the arrays small and fast where a rounded cost is enough.
+        """
+        r0, r1, c0, c1 = bounds
+        h, w = r1 - r0, c1 - c0
+        cols = self.grid.cols
+        passable = self.grid.occupancy[r0 + 1:r1 + 1, c0 + 1:c1 + 1] == FREE
+        blocked = np.where(passable, 0, INF).astype(dtype)  # Added after each round to keep walls at inf
+        dist = np.full((len(sources), h + 2, w + 2), INF, dtype=dtype)
+        for i, cell in enumerate(sources):
+            r, c = divmod(cell, cols)
+            dist[i, r - r0 + 1, c - c0 + 1] = 0.0
+        inner = dist[:, 1:-1, 1:-1]
+        best = np.empty(inner.shape, dtype=dtype)
+        candidate = np.empty_like(best)
+        
+        while True:
+            np.copyto(best, inner)
+            for (dr, dc), cost in self._moves:
+                np.add(dist[:, 1 - dr:h + 1 - dr, 1 - dc:w + 1 - dc], dtype(cost), out=candidate)
+                np.minimum(best, candidate, out=best)
+            best += blocked
+            if not (best < inner).any():
+                return inner
+            inner[...] = best
+    
+    def _cluster(self, cluster: Tuple[int, int]) -> Cluster:
+        """Cluster data, (re)built if missing or stale"""
+        data = self._clusters.get(cluster)
+        if data is not None and cluster not in self._stale:
+            return data
+        
+        ci, cj = cluster
+        inter: Dict[int, List[Tuple[int, float]]] = {}
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                other = (ci + di, cj + dj)
+                if other == cluster or not (0 <= other[0] < self.cluster_rows and 0 <= other[1] < self.cluster_cols):
+                    continue
+                for a, b, cost in self._border(cluster, other):
+                    mine, theirs = (a, b) if cluster < other else (b, a)
+                    inter.setdefault(mine, []).append((theirs, cost))
+        nodes = sorted(inter)
+        
+        if data is not None and cluster not in self._dirty and data.nodes == nodes:
+            costs = data.costs  # Same cells, same entrances: the costs still hold
+        else:
+            costs = self._node_costs(cluster, nodes)
+        data = Cluster(nodes, inter, costs)
+        self._clusters[cluster] = data
+        self._stale.discard(cluster)
+        self._dirty.discard(cluster)
+        return data
+    
+    def _node_costs(self, cluster: Tuple[int, int], nodes: List[int]) -> np.ndarray:
+        self.clusters_built += 1
+        if not nodes:
+            return np.empty((0, 0))
+        r0, _, c0, _ = self._bounds(cluster)
+        cols = self.grid.cols
+        dist = self._distances(self._bounds(cluster), nodes)
+        rows_idx = np.array([cell // cols - r0 for cell in nodes])
+        cols_idx = np.array([cell % cols - c0 for cell in nodes])
+        return dist[:, rows_idx, cols_idx].astype(np.float64)
+    
+    def precompute(self):
+        """Build entrances and intra-cluster costs for every cluster now"""
+        for ci in range(self.cluster_rows):
+            for cj in range(self.cluster_cols):
+                self._cluster((ci, cj))
+    
+    # ---- Queries ----
+    
+    def _heuristic(self, cell: int, target: Tuple[int, int]) -> float:
+        """Octile distance (admissible for the ucs() move costs)"""
+        r, c = divmod(cell, self.grid.cols)
+        dr, dc = abs(r - target[0]), abs(c - target[1])
+        return config.DIAGONAL_MOVE_COST * min(dr, dc) + config.STRAIGHT_MOVE_COST * abs(dr - dc)
+    
+    def _region(self, a: Tuple[int, int], b: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Bounds covering clusters a and b"""
+        ar0, ar1, ac0, ac1 = self._bounds(a)
+        br0, br1, bc0, bc1 = self._bounds(b)
+        return (min(ar0, br0), max(ar1, br1), min(ac0, bc0), max(ac1, bc1))
+    
+    def find_path(self, start: Optional[Tuple[int, int]] = None,
+                  target: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """Path start -> target (defaults: grid.start, grid.target), empty if none was found or an end is blocked"""
+        grid = self.grid
+        start = tuple(start) if start is not None else grid.start
+        target = tuple(target) if target is not None else grid.target
+        self.abstract_expansions = 0
+        self.path = []
+        if not grid.is_valid(start) or not grid.is_valid(target):
+            return self.path
+        if start == target:
+            self.path = [start]
+            return self.path
+        
+        cols = grid.cols
+        start_id = start[0] * cols + start[1]
+        target_id = target[0] * cols + target[1]
+        start_cluster, target_cluster = self.cluster_of(start), self.cluster_of(target)
+        start_data, target_data = self._cluster(start_cluster), self._cluster(target_cluster)
+        
+        # Temporary edges: start -> its cluster's entrances, target's cluster entrances -> target.
+        # When the clusters touch, the start also gets a direct edge through both of them,
+        # since the best short path rarely crosses the border at an entrance
+        near = max(abs(start_cluster[0] - target_cluster[0]), abs(start_cluster[1] - target_cluster[1])) <= 1
+        start_region = self._region(start_cluster, target_cluster) if near else self._bounds(start_cluster)
+        r0, _, c0, _ = start_region
+        tr0, _, tc0, _ = self._bounds(target_cluster)
+        from_start = self._distances(start_region, [start_id])[0]
+        to_target = self._distances(self._bounds(target_cluster), [target_id])[0]
+        start_edges = [(node, float(from_start[node // cols - r0, node % cols - c0])) for node in start_data.nodes]
+        if near:
+            start_edges.append((target_id, float(from_start[target[0] - r0, target[1] - c0])))
+        exit_costs = {node: float(to_target[node // cols - tr0, node % cols - tc0]) for node in target_data.nodes}
+        
+        # A* over entrance nodes
+        frontier = [(self._heuristic(start_id, target), 0.0, start_id)]
+        cost_so_far = {start_id: 0.0}
+        came_from = {start_id: None}
+        closed = set()
+        while frontier:
+            _, cost, current = heapq.heappop(frontier)
+            if current == target_id:
+                break
+            if current in closed:
+                continue
+            closed.add(current)
+            self.abstract_expansions += 1
+            
+            # The start may itself be an entrance, so it gets both kinds of edges
+            edges = list(start_edges) if current == start_id else []
+            cluster = self.cluster_of(divmod(current, cols))
+            data = self._cluster(cluster)
+            if current in data.index:
+                row = data.costs[data.index[current]].tolist()
+                edges.extend((node, row[i]) for i, node in enumerate(data.nodes) if node != current)
+                edges.extend(data.inter[current])
+                if cluster == target_cluster:
+                    edges.append((target_id, exit_costs[current]))
+            
+            for neighbor, edge_cost in edges:
+                new_cost = cost + edge_cost
+                if new_cost < cost_so_far.get(neighbor, INF):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heapq.heappush(frontier, (new_cost + self._heuristic(neighbor, target), new_cost, neighbor))
+        
+        if target_id not in came_from:
+            return self.path
+        
+        # Refine the abstract path one edge at a time
+        nodes = []
+        current = target_id
+        while current is not None:
+            nodes.append(current)
+            current = came_from[current]
+        nodes.reverse()
+        path = [start]
+        for a, b in zip(nodes, nodes[1:]):
+            bounds = start_region if a == start_id else None
+            path.extend(self._refine(divmod(a, cols), divmod(b, cols), bounds)[1:])
+        self.path = path
+        return path
+    
+    def _refine(self, a: Tuple[int, int], b: Tuple[int, int],
+                bounds: Optional[Tuple[int, int, int, int]] = None) -> List[Tuple[int, int]]:
+        """Cells a -> b: a single move across a border, or a descent inside a's cluster (or bounds)"""
+        if max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 and self.cluster_of(a) != self.cluster_of(b):
+            return [a, b]
+        if bounds is None:
+            bounds = self._bounds(self.cluster_of(a))
+        r0, r1, c0, c1 = bounds
+        # float64, so the descent still matches costs exactly on large clusters
+        dist = self._distances(bounds, [a[0] * self.grid.cols + a[1]], np.float64)[0]
+        
+        # Walk back from b, each time to the cheaper neighbor whose cost plus the move cost comes closest
+        path = [b]
+        r, c = b
+        while (r, c) != a:
+            here = dist[r - r0, c - c0]
+            step, error = None, INF
+            for (dr, dc), cost in self._moves:
+                pr, pc = r - dr, c - dc
+                if r0 <= pr < r1 and c0 <= pc < c1 and dist[pr - r0, pc - c0] < here:
+                    miss = abs(dist[pr - r0, pc - c0] + cost - here)
+                    if miss < error:
+                        step, error = (pr, pc), miss
+            if step is None:
+                raise RuntimeError(f"Cannot refine {a} -> {b}: no cheaper cell next to {(r, c)}")
+            r, c = step
+            path.append(step)
+        path.reverse()
+        return path
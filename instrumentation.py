@@ -0,0 +1,174 @@
+"""
+Search Instrumentation
+Per-run counters, timers and callbacks that can be attached to
+SearchAlgorithms without touching the uninstrumented code paths
+"""
+
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional, Tuple
+
+CellCallback = Callable[[Tuple[int, int]], None]
+
+
+class RunCounters:
+    """Counters of one search run"""
+    
+    def __init__(self):
+        self.steps = 0
+        self.expanded = 0           # Cells expanded (explore events)
+        self.generated = 0          # Cells added to the frontier, re-insertions included
+        self.successors = 0         # Cells returned by the successor functions
+        self.peak_frontier = 0
+        self.obstacle_spawns = 0
+        self.neighbor_calls = 0     # neighbor_ids / weighted_neighbor_ids (jumps for jps)
+        self.neighbor_time = 0.0    # Seconds spent in those calls
+        self.spawn_calls = 0
+        self.spawn_time = 0.0       # Seconds spent in spawn_dynamic_obstacle
+        self.wall_time = 0.0
+        self.peak_memory = None     # Bytes, when tracemalloc capture is on
+    
+    @property
+    def duplicates(self) -> int:
+        """Successors rejected because they were already reached"""
+        return max(0, self.successors - self.generated)
+    
+    def as_dict(self) -> Dict:
+        counters = dict(vars(self))
+        counters["duplicates"] = self.duplicates
+        return counters
+    
+    def __repr__(self) -> str:
+        return f"RunCounters({self.as_dict()})"
+
+
+class _InstrumentedTrace:
+    """Forwards trace calls to the run's real trace while counting them"""
+    
+    def __init__(self, trace, instrumentation: "Instrumentation"):
+        self._trace = trace
+        self._counters = instrumentation.counters
+        self._on_expand = instrumentation.on_expand
+        self._on_generate = instrumentation.on_generate
+    
+    def __getattr__(self, name):
+        return getattr(self._trace, name)
+    
+    def __len__(self) -> int:
+        return len(self._trace)
+    
+    def begin_step(self, frontier_size: int, obstacle: Tuple[int, int] = None) -> bool:
+        counters = self._counters
+        counters.steps += 1
+        if frontier_size > counters.peak_frontier:
+            counters.peak_frontier = frontier_size
+        return self._trace.begin_step(frontier_size, obstacle)
+    
+    def push(self, cell: int):
+        self._counters.generated += 1
+        if self._on_generate is not None:
+            self._on_generate(divmod(cell, self._trace.cols))
+        self._trace.push(cell)
+    
+    def explore(self, cell: int):
+        self._counters.expanded += 1
+        if self._on_expand is not None:
+            self._on_expand(divmod(cell, self._trace.cols))
+        self._trace.explore(cell)
+
+
+class Instrumentation:
+    """Counters, timers and callbacks for the runs of one SearchAlgorithms
+    
+    Attach with ``SearchAlgorithms(grid, instrumentation=...)`` or
+    ``search.instrument(...)``. While attached, each run of that search
+    looks its successor and obstacle-spawning functions up through wrap(),
+    which adds timers, and records its trace through a counting proxy. The
+    grid itself is never patched, so other searches sharing it are not
+    affected; detached (the default) the searches run exactly as before.
+    ``counters`` holds the current or last run.
+    """
+    
+    def __init__(self, trace_memory: bool = False, on_expand: Optional[CellCallback] = None,
+                 on_generate: Optional[CellCallback] = None, clock: Callable[[], float] = time.perf_counter):
+        self.trace_memory = trace_memory  # Capture peak memory with tracemalloc (slows the search down)
+        self.on_expand = on_expand        # Called with each expanded cell
+        self.on_generate = on_generate    # Called with each cell added to the frontier
+        self.clock = clock
+        self.counters = RunCounters()
+        self._run_start = None
+        self._started_tracemalloc = False
+    
+    def wrap(self, function, kind: str):
+        """Timed wrapper of a search's successor ("successors", "jump") or spawning ("spawn") function"""
+        if kind == "successors":
+            return self._timed_successors(function)
+        if kind == "jump":
+            return self._counted_jumps(function)
+        if kind == "spawn":
+            return self._timed_spawn(function)
+        raise ValueError(f"Unknown function kind: {kind}")
+    
+    def _timed_successors(self, method):
+        clock = self.clock
+        
+        def timed(cell):
+            counters = self.counters
+            started = clock()
+            successors = method(cell)
+            counters.neighbor_time += clock() - started
+            counters.neighbor_calls += 1
+            counters.successors += len(successors)
+            return successors
+        return timed
+    
+    def _timed_spawn(self, method):
+        clock = self.clock
+        
+        def timed():
+            counters = self.counters
+            started = clock()
+            obstacle = method()
+            counters.spawn_time += clock() - started
+            counters.spawn_calls += 1
+            if obstacle is not None:
+                counters.obstacle_spawns += 1
+            return obstacle
+        return timed
+    
+    def _counted_jumps(self, method):
+        clock = self.clock
+        
+        def timed(cell, dr, dc, target):
+            counters = self.counters
+            started = clock()
+            jump = method(cell, dr, dc, target)
+            counters.neighbor_time += clock() - started
+            counters.neighbor_calls += 1
+            if jump[0] >= 0:
+                counters.successors += 1
+            return jump
+        return timed
+    
+    def begin_run(self, trace):
+        """Reset the counters for a new run; returns the trace the algorithm should record to"""
+        self.counters = RunCounters()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+        self._run_start = self.clock()
+        return _InstrumentedTrace(trace, self)
+    
+    def end_run(self):
+        """Stop the run's timers (called when the algorithm returns)"""
+        if self._run_start is None:
+            return
+        self.counters.wall_time = self.clock() - self._run_start
+        self._run_start = None
+        if self.trace_memory:
+            self.counters.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
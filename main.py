@@ -22,6 +22,7 @@ def main():
     print("  4. DLS - Depth-Limited Search")
     print("  5. IDDFS - Iterative Deepening DFS")
     print("  6. Bidirectional Search")
+    print("  7. JPS - Jump Point Search")
     print("\nStarting GUI...")
     print("=" * 60)
     
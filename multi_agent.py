@@ -0,0 +1,149 @@
+"""
+Multi-Agent Search
+Answers many agents' (start, target) queries on one GridEnvironment in a
+single batched pass instead of one SearchAlgorithms run per agent
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config
+from grid_environment import FREE, GridEnvironment, SearchAlgorithms
+from wavefront import NO_PARENT
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # Working arrays of the groups searched together
+
+# A target and its agents as (agent index, start) pairs
+Group = Tuple[Tuple[int, int], List[Tuple[int, Tuple[int, int]]]]
+
+
+class AgentResult(NamedTuple):
+    """Outcome of one agent's query"""
+    index: int  # Position of the agent in the submitted list
+    success: bool
+    path: List[Tuple[int, int]]
+    path_cost: float
+    moves: int        # Path length in moves (-1 without a path)
+    expanded: int     # Cells the agent's group search had reached when the agent was answered
+    group_size: int   # Agents sharing the agent's search (0 when answered without one)
+
+
+class MultiAgentPlanner:
+    """Batched shortest paths (in moves, like bfs()) for many agents on a shared map
+    
+    Agents with the same target share one backward wavefront grown from that
+    target, which stops as soon as every agent of the group has been reached.
+    The wavefronts of many groups advance together: each group owns a slice
+    of one flat working array, so every wave is a handful of NumPy
+    operations over all groups at once. Groups are searched in batches that
+    keep the working arrays under max_bytes. The map is taken as it is; no
+    dynamic obstacles spawn during solve().
+    """
+    
+    def __init__(self, grid: GridEnvironment, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.searches = 0  # Backward searches run by the last solve()
+    
+    def solve(self, agents: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[AgentResult]:
+        """Paths for a list of (start, target) pairs; results come back in the same order
+        
+        An agent fails when its start or target is not free or no path
+        exists. Unreachable targets are ruled out up front when the grid
+        has a component index (GridEnvironment.build_components()).
+        """
+        grid = self.grid
+        results: List[Optional[AgentResult]] = [None] * len(agents)
+        groups: Dict[Tuple[int, int], List[Tuple[int, Tuple[int, int]]]] = {}
+        for index, (start, target) in enumerate(agents):
+            start, target = tuple(start), tuple(target)
+            if not (grid.is_valid(start) and grid.is_valid(target)) or not grid.reachable(start, target):
+                results[index] = AgentResult(index, False, [], 0.0, -1, 0, 0)
+            elif start == target:
+                results[index] = AgentResult(index, True, [start], 0.0, 0, 0, 0)
+            else:
+                groups.setdefault(target, []).append((index, start))
+        
+        self.searches = len(groups)
+        targets = list(groups)
+        per_batch = max(1, self.max_bytes // (2 * grid.occupancy.size))
+        for first in range(0, len(targets), per_batch):
+            batch = targets[first:first + per_batch]
+            for result in self._solve_groups([(target, groups[target]) for target in batch]):
+                results[result.index] = result
+        return results
+    
+    def _solve_groups(self, groups: List[Group]) -> List[AgentResult]:
+        """One vectorized backward wavefront per group, all advancing together"""
+        grid = self.grid
+        stride = grid._stride
+        size = grid.occupancy.size  # Cells per group slice (padded)
+        offsets = [dr * stride + dc for dr, dc in config.DIRECTIONS]
+        
+        def padded(pos: Tuple[int, int]) -> int:
+            return (pos[0] + 1) * stride + pos[1] + 1
+        
+        # Group g's copy of padded cell p lives at g * size + p; the BORDER ring
+        # keeps every wave inside its own group's slice
+        open_cells = np.tile((grid.occupancy == FREE).ravel(), len(groups))  # Free and not yet reached
+        parent = np.full(open_cells.size, NO_PARENT, dtype=np.int8)
+        sources = np.array([g * size + padded(target) for g, (target, _) in enumerate(groups)], dtype=np.intp)
+        open_cells[sources] = False
+        
+        agent_index = [index for _, members in groups for index, _ in members]
+        agent_group = np.array([g for g, (_, members) in enumerate(groups) for _ in members], dtype=np.intp)
+        agent_cells = np.array([g * size + padded(start) for g, (_, members) in enumerate(groups)
+                                for _, start in members], dtype=np.intp)
+        pending = np.ones(len(agent_cells), dtype=bool)
+        reached_count = np.ones(len(groups), dtype=np.int64)  # The target itself
+        answered = {}  # Agent slot -> (moves, expanded)
+        
+        frontier = sources
+        level = 0
+        while frontier.size:
+            level += 1
+            waves = []
+            for direction, offset in enumerate(offsets):
+                reached = frontier + offset
+                reached = reached[open_cells[reached]]
+                open_cells[reached] = False
+                parent[reached] = direction
+                waves.append(reached)
+            frontier = np.concatenate(waves)
+            reached_count += np.bincount(frontier // size, minlength=len(groups))
+            
+            newly = pending & ~open_cells[agent_cells]
+            if newly.any():
+                for slot in np.flatnonzero(newly).tolist():
+                    answered[slot] = (level, int(reached_count[agent_group[slot]]))
+                pending &= ~newly
+                if not pending.any():
+                    break
+                # Groups with every agent answered stop growing
+                waiting = np.bincount(agent_group[pending], minlength=len(groups)) > 0
+                frontier = frontier[waiting[frontier // size]]
+        
+        results = []
+        for slot, index in enumerate(agent_index):
+            group_size = len(groups[agent_group[slot]][1])
+            if slot not in answered:
+                results.append(AgentResult(index, False, [], 0.0, -1, int(reached_count[agent_group[slot]]), group_size))
+                continue
+            moves, expanded = answered[slot]
+            path = self._walk(parent, int(agent_cells[slot]), offsets, agent_group[slot] * size)
+            results.append(AgentResult(index, True, path, SearchAlgorithms.path_cost(path), moves, expanded, group_size))
+        return results
+    
+    def _walk(self, parent: np.ndarray, cell: int, offsets: List[int], base: int) -> List[Tuple[int, int]]:
+        """Follow parent directions from an agent's start back to its group's target"""
+        stride = self.grid._stride
+        path = []
+        direction = parent[cell]
+        while True:
+            r, c = divmod(cell - base, stride)
+            path.append((r - 1, c - 1))
+            if direction == NO_PARENT:
+                return path
+            cell -= offsets[direction]
+            direction = parent[cell]
@@ -0,0 +1,209 @@
+"""
+Incremental Replanner
+Lifelong Planning A* (LPA*) on a GridEnvironment that repairs its search
+tree when walls or dynamic obstacles change instead of searching again
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import config
+from grid_environment import FREE, GridEnvironment
+
+INF = math.inf
+KEY_DIGITS = 9  # Keys are rounded so float noise in summed move costs cannot break ties
+
+
+class LPAStar:
+    """Incremental shortest-path planner from grid.start to grid.target
+    
+    The planner listens to grid changes. Each change only queues the affected
+    cells; replan() then updates exactly those vertices and re-expands the part
+    of the search tree whose costs changed, so work is proportional to the
+    change rather than to the map. Costs match ucs(): 1 for straight moves,
+    1.414 for diagonal ones.
+    """
+    
+    def __init__(self, grid: GridEnvironment, use_heuristic: bool = True):
+        self.grid = grid
+        self.use_heuristic = use_heuristic  # False gives an incremental uniform-cost search
+        self.path = []  # Current shortest path (start ... target), empty if none
+        self.expansions = 0  # Vertices expanded by the last replan()
+        self.total_expansions = 0
+        self._pending: Set[int] = set()
+        self._moves = [(dr * grid.cols + dc, dr, dc, grid.move_cost(dr, dc)) for dr, dc in config.DIRECTIONS]
+        self._reset()
+        grid.add_change_listener(self._on_cells_changed)
+    
+    def close(self):
+        """Stop listening to grid changes"""
+        self.grid.remove_change_listener(self._on_cells_changed)
+    
+    def _reset(self):
+        """Forget all search state (used when start or target moves)"""
+        grid = self.grid
+        self.start = grid.start
+        self.target = grid.target
+        self._start_id = self.start[0] * grid.cols + self.start[1]
+        self._target_id = self.target[0] * grid.cols + self.target[1]
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {self._start_id: 0.0}
+        self._queue: List[Tuple[float, float, int]] = []
+        self._queued: Dict[int, Tuple[float, float]] = {}
+        self._pending.clear()
+        self._push(self._start_id)
+    
+    def _on_cells_changed(self, cells: List[int]):
+        self._pending.update(cells)
+    
+    def _passable(self, cell: int) -> bool:
+        """Cell can be entered (and left)"""
+        grid = self.grid
+        r, c = divmod(cell, grid.cols)
+        return grid._cells[(r + 1) * grid._stride + c + 1] == FREE
+    
+    def _neighbors(self, cell: int):
+        """(neighbor id, move cost) for every in-bounds cell around cell, ignoring occupancy"""
+        grid = self.grid
+        r, c = divmod(cell, grid.cols)
+        for offset, dr, dc, cost in self._moves:
+            if 0 <= r + dr < grid.rows and 0 <= c + dc < grid.cols:
+                yield cell + offset, cost
+    
+    def _heuristic(self, cell: int) -> float:
+        """Octile distance to the target (consistent for the ucs() move costs)"""
+        if not self.use_heuristic:
+            return 0.0
+        r, c = divmod(cell, self.grid.cols)
+        dr = abs(r - self.target[0])
+        dc = abs(c - self.target[1])
+        return config.DIAGONAL_MOVE_COST * min(dr, dc) + config.STRAIGHT_MOVE_COST * abs(dr - dc)
+    
+    def _key(self, cell: int) -> Tuple[float, float]:
+        best = min(self._g.get(cell, INF), self._rhs.get(cell, INF))
+        return (round(best + self._heuristic(cell), KEY_DIGITS), round(best, KEY_DIGITS))
+    
+    def _push(self, cell: int):
+        key = self._key(cell)
+        self._queued[cell] = key
+        heapq.heappush(self._queue, (key[0], key[1], cell))
+    
+    def _top_key(self) -> Tuple[float, float]:
+        """Smallest valid key in the queue, dropping stale heap entries"""
+        queue = self._queue
+        while queue:
+            k1, k2, cell = queue[0]
+            if self._queued.get(cell) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(queue)
+        return (INF, INF)
+    
+    def _update_vertex(self, cell: int):
+        if cell != self._start_id:
+            best = INF
+            if self._passable(cell):
+                g = self._g
+                for neighbor, cost in self._neighbors(cell):
+                    if neighbor == self._start_id or self._passable(neighbor):
+                        value = g.get(neighbor, INF) + cost
+                        if value < best:
+                            best = value
+            self._rhs[cell] = best
+        self._queued.pop(cell, None)
+        if self._g.get(cell, INF) != self._rhs.get(cell, INF):
+            self._push(cell)
+    
+    def _compute_shortest_path(self):
+        g, rhs = self._g, self._rhs
+        target = self._target_id
+        while (self._top_key() < self._key(target)
+               or rhs.get(target, INF) != g.get(target, INF)):
+            if not self._queue:
+                break
+            _, _, cell = heapq.heappop(self._queue)
+            del self._queued[cell]
+            self.expansions += 1
+            if g.get(cell, INF) > rhs.get(cell, INF):
+                g[cell] = rhs[cell]
+                for neighbor, _ in self._neighbors(cell):
+                    self._update_vertex(neighbor)
+            else:
+                g[cell] = INF
+                self._update_vertex(cell)
+                for neighbor, _ in self._neighbors(cell):
+                    self._update_vertex(neighbor)
+    
+    def _extract_path(self) -> List[Tuple[int, int]]:
+        """Walk from the target to the start along consistent predecessors
+        
+        Each step goes to a cell with g == rhs whose g plus the move cost is
+        exactly g of the current cell, so g strictly decreases and the walk
+        cannot cycle. Cells left inconsistent after _compute_shortest_path()
+        are never stepped on.
+        """
+        g, rhs = self._g, self._rhs
+        if g.get(self._target_id, INF) == INF:
+            return []
+        cell = self._target_id
+        cells = [cell]
+        while cell != self._start_id:
+            here = g[cell]
+            best = None
+            for neighbor, cost in self._neighbors(cell):
+                if neighbor == self._start_id or self._passable(neighbor):
+                    value = g.get(neighbor, INF)
+                    if value < here and value == rhs.get(neighbor, INF) and value + cost == here:
+                        best = neighbor
+                        break
+            if best is None or len(cells) > len(g):
+                raise RuntimeError(f"LPA* search tree is inconsistent at {divmod(cell, self.grid.cols)}")
+            cell = best
+            cells.append(cell)
+        cols = self.grid.cols
+        return [divmod(cell, cols) for cell in reversed(cells)]
+    
+    def path_is_valid(self) -> bool:
+        """True if every cell of the current path after the start is still free"""
+        if not self.path:
+            return False
+        return all(self.grid.is_valid(pos) for pos in self.path[1:])
+    
+    def path_cost(self) -> Optional[float]:
+        """Cost of the current shortest path, or None if the target is unreachable"""
+        cost = self._g.get(self._target_id, INF)
+        return None if cost == INF else cost
+    
+    def replan(self) -> List[Tuple[int, int]]:
+        """Apply queued grid changes, repair the search tree and refresh self.path"""
+        self.expansions = 0
+        if (self.grid.start, self.grid.target) != (self.start, self.target):
+            self._reset()
+        if self._pending:
+            changed, self._pending = self._pending, set()
+            dirty = set(changed)
+            for cell in changed:
+                dirty.update(neighbor for neighbor, _ in self._neighbors(cell))
+            for cell in dirty:
+                self._update_vertex(cell)
+        self._compute_shortest_path()
+        self.total_expansions += self.expansions
+        self.path = self._extract_path()
+        return self.path
+    
+    def plan(self) -> bool:
+        """Compute (or repair) the shortest path; True if the target is reachable"""
+        return bool(self.replan())
+    
+    def step(self) -> Optional[Tuple[int, int]]:
+        """One search step of the dynamic-obstacle world: maybe spawn an obstacle, then repair
+        
+        Returns the spawned obstacle position (or None). The path is only
+        re-planned when the obstacle landed on it; otherwise the change stays
+        queued for the next replan() because blocking an off-path cell cannot
+        make the current path suboptimal.
+        """
+        obstacle = self.grid.spawn_dynamic_obstacle()
+        if obstacle is not None and obstacle in self.path:
+            self.replan()
+        return obstacle
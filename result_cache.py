@@ -0,0 +1,111 @@
+"""
+Search Result Cache
+Answers repeated (map, start, target, algorithm) queries from memory,
+keyed by the grid's Zobrist hash
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import config
+from grid_environment import SearchAlgorithms
+
+DEFAULT_MAX_ENTRIES = 1024
+ROUND_ALGORITHMS = ("dls", "iddfs")  # Algorithms that leave per-round statistics
+
+
+class CachedResult(NamedTuple):
+    """Path and statistics of one search run"""
+    success: bool
+    path: List[Tuple[int, int]]
+    path_cost: float
+    steps: int
+    expansions: int
+    peak_frontier: int
+    round_stats: List[Dict]  # dls()/iddfs() rounds, empty for the others
+    trace: object            # The run's SearchTrace or StepCounter, shared by every hit
+
+
+class ResultCache:
+    """Bounded LRU cache of search results keyed by (grid state, start, target, algorithm, depth limit)
+    
+    The grid state is GridEnvironment.state_hash, a Zobrist hash of walls
+    and dynamic obstacles kept up to date on every change, so a lookup
+    costs nothing beyond building the key. Runs that may spawn dynamic
+    obstacles depend on the random state as well, so they are never cached
+    (counted in bypasses). hits and misses show how well max_entries fits
+    the workload.
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self._results: "OrderedDict[Tuple, CachedResult]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    def clear(self):
+        self._results.clear()
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    @staticmethod
+    def key(search: SearchAlgorithms, algorithm: str, depth_limit: Optional[int] = None) -> Tuple:
+        """Cache key of running algorithm on search.grid as it is now"""
+        grid = search.grid
+        # An attached component index ends unreachable searches early, which changes their stats
+        return (grid.state_hash, grid.rows, grid.cols, tuple(grid.start), tuple(grid.target),
+                algorithm, depth_limit, search.record_trace, grid.components is not None)
+    
+    def run(self, search: SearchAlgorithms, algorithm: str, depth_limit: Optional[int] = None) -> CachedResult:
+        """Run an algorithm (see config.ALGORITHM_METHODS), or take its result from the cache
+        
+        Either way search ends up as after the run: path (on success),
+        trace and round_stats are set. A hit runs nothing, so attached
+        instrumentation does not see it. depth_limit applies to "dls" only
+        (default config.DEPTH_LIMIT).
+        """
+        if algorithm not in config.ALGORITHM_METHODS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        if algorithm == "dls":
+            depth_limit = config.DEPTH_LIMIT if depth_limit is None else depth_limit
+        else:
+            depth_limit = None
+        
+        if search.grid.obstacle_probability > 0:
+            self.bypasses += 1
+            return self._search(search, algorithm, depth_limit)
+        
+        key = self.key(search, algorithm, depth_limit)
+        result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            if result.success:
+                search.path = list(result.path)
+            search.trace = result.trace
+            if algorithm in ROUND_ALGORITHMS:
+                search.round_stats = list(result.round_stats)
+            return result
+        
+        self.misses += 1
+        result = self._search(search, algorithm, depth_limit)
+        self._results[key] = result
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _search(search: SearchAlgorithms, algorithm: str, depth_limit: Optional[int]) -> CachedResult:
+        success = search.dls(depth_limit) if algorithm == "dls" else search.run(algorithm)
+        path = list(search.path) if success else []
+        trace = search.trace
+        round_stats = list(search.round_stats) if algorithm in ROUND_ALGORITHMS else []
+        return CachedResult(success, path, SearchAlgorithms.path_cost(path), len(trace), trace.expansions,
+                            trace.peak_frontier, round_stats, trace)
@@ -0,0 +1,313 @@
+"""
+Search Trace Recorder
+Compact, delta-encoded record of a search run that can rebuild the
+frontier and explored sets at any step
+"""
+
+from array import array
+from collections import Counter
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# Event kinds stored in SearchTrace.kinds
+PUSH = 0       # Cell added to the frontier
+POP = 1        # Cell removed from the frontier
+EXPLORE = 2    # Cell added to the explored set
+OBSTACLE = 3   # Dynamic obstacle spawned on a cell
+RESET = 4      # Frontier and explored set cleared (start of an IDDFS round)
+
+EVENT_NAMES = {PUSH: "push", POP: "pop", EXPLORE: "explore", OBSTACLE: "obstacle", RESET: "reset"}
+
+DEFAULT_CHECKPOINT_INTERVAL = 256
+
+
+class SearchStep(NamedTuple):
+    """One step handed out by SearchAlgorithms.stream()"""
+    index: int
+    events: List[Tuple[int, Optional[Tuple[int, int]]]]  # (kind, cell) in order; RESET carries no cell
+    done: bool  # Last step of the run
+    success: Optional[bool]  # Result of the run, set on the last step
+
+
+class SearchTrace:
+    """Per-step event log of a search with periodic frontier checkpoints
+    
+    A step is one iteration of an algorithm's main loop. The state at step k
+    is the frontier and explored set at the moment the step begins, which is
+    what ``frontier_history[k]`` / ``explored_history[k]`` used to hold.
+    The searches pass cells as flat ids (``r * cols + c``), which are stored
+    as they are in typed arrays; only the dynamic obstacle of a step is a
+    (row, col) position.
+    """
+    
+    def __init__(self, rows: int, cols: int, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        self.rows = rows
+        self.cols = cols
+        self.checkpoint_interval = checkpoint_interval
+        
+        # Event log
+        self.kinds = array('B')
+        self.cells = array('i')
+        
+        # Explored cells in the order they were first explored; the explored set
+        # at a step is a slice of this log because it only grows between resets
+        self.explored_log = array('i')
+        self._explored_mask = bytearray(rows * cols)
+        self._round_start = 0
+        self.expansions = 0  # Every explore call, including repeats (e.g. both bidirectional sides)
+        
+        # Per-step index
+        self.step_starts = array('q')       # First event of each step
+        self.frontier_sizes = array('q')    # Frontier size when the step began
+        self.explored_starts = array('q')   # explored_log slice holding the explored set
+        self.explored_ends = array('q')
+        self.obstacle_steps = []            # Steps on which a dynamic obstacle spawned
+        
+        # Frontier contents every checkpoint_interval steps
+        self.checkpoints = []
+    
+    def __len__(self) -> int:
+        """Number of recorded steps"""
+        return len(self.step_starts)
+    
+    @property
+    def peak_frontier(self) -> int:
+        """Largest frontier seen at the start of any step"""
+        return max(self.frontier_sizes, default=0)
+    
+    def _cell_id(self, pos: Tuple[int, int]) -> int:
+        return pos[0] * self.cols + pos[1]
+    
+    def _position(self, cell: int) -> Tuple[int, int]:
+        return divmod(cell, self.cols)
+    
+    def begin_step(self, frontier_size: int, obstacle: Tuple[int, int] = None) -> bool:
+        """Start a new step; returns True when the caller must pass the frontier to checkpoint()"""
+        step = len(self.step_starts)
+        self.step_starts.append(len(self.kinds))
+        self.frontier_sizes.append(frontier_size)
+        self.explored_starts.append(self._round_start)
+        self.explored_ends.append(len(self.explored_log))
+        if obstacle is not None:
+            self.obstacle_steps.append(step)
+            self.kinds.append(OBSTACLE)
+            self.cells.append(self._cell_id(obstacle))
+        return step % self.checkpoint_interval == 0
+    
+    def checkpoint(self, frontier: Iterable[int]):
+        """Store the full frontier (flat ids) of the step that was just begun"""
+        self.checkpoints.append(array('i', frontier))
+    
+    def push(self, cell: int):
+        """Record a cell entering the frontier"""
+        self.kinds.append(PUSH)
+        self.cells.append(cell)
+    
+    def pop(self, cell: int):
+        """Record a cell leaving the frontier"""
+        self.kinds.append(POP)
+        self.cells.append(cell)
+    
+    def explore(self, cell: int):
+        """Record a cell entering the explored set (repeats within a round are ignored)"""
+        self.expansions += 1
+        if not self._explored_mask[cell]:
+            self._explored_mask[cell] = 1
+            self.explored_log.append(cell)
+            self.kinds.append(EXPLORE)
+            self.cells.append(cell)
+    
+    def reset(self):
+        """Record that the frontier and explored set were cleared"""
+        for cell in self.explored_log[self._round_start:]:
+            self._explored_mask[cell] = 0
+        self._round_start = len(self.explored_log)
+        self.kinds.append(RESET)
+        self.cells.append(-1)
+    
+    def _check_step(self, step: int) -> int:
+        if step < 0:
+            step += len(self)
+        if step < 0 or step >= len(self):
+            raise IndexError("trace step out of range")
+        return step
+    
+    def frontier_size(self, step: int) -> int:
+        """Frontier size when a step began"""
+        return self.frontier_sizes[self._check_step(step)]
+    
+    def explored_count(self, step: int) -> int:
+        """Explored set size when a step began"""
+        step = self._check_step(step)
+        return self.explored_ends[step] - self.explored_starts[step]
+    
+    def explored_cells(self, step: int) -> array:
+        """Flat ids of the explored set when a step began"""
+        step = self._check_step(step)
+        return self.explored_log[self.explored_starts[step]:self.explored_ends[step]]
+    
+    def explored_at(self, step: int) -> Set[Tuple[int, int]]:
+        """Explored set when a step began"""
+        cols = self.cols
+        return {divmod(cell, cols) for cell in self.explored_cells(step)}
+    
+    def frontier_cells(self, step: int) -> Counter:
+        """Frontier multiset of flat ids when a step began (replayed from the nearest checkpoint)"""
+        step = self._check_step(step)
+        checkpoint = step // self.checkpoint_interval
+        frontier = Counter(self.checkpoints[checkpoint])
+        kinds, cells = self.kinds, self.cells
+        for index in range(self.step_starts[checkpoint * self.checkpoint_interval], self.step_starts[step]):
+            kind = kinds[index]
+            if kind == PUSH:
+                frontier[cells[index]] += 1
+            elif kind == POP:
+                cell = cells[index]
+                if frontier[cell] <= 1:
+                    del frontier[cell]
+                else:
+                    frontier[cell] -= 1
+            elif kind == RESET:
+                frontier.clear()
+        return frontier
+    
+    def frontier_at(self, step: int) -> List[Tuple[int, int]]:
+        """Frontier when a step began, as a list of cells (duplicates kept, order unspecified)"""
+        cols = self.cols
+        return [divmod(cell, cols) for cell in self.frontier_cells(step).elements()]
+    
+    def step_events(self, step: int) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        """Events recorded during a step as (kind, cell) pairs; RESET carries no cell"""
+        step = self._check_step(step)
+        end = self.step_starts[step + 1] if step + 1 < len(self) else len(self.kinds)
+        for index in range(self.step_starts[step], end):
+            cell = self.cells[index]
+            yield self.kinds[index], (self._position(cell) if cell >= 0 else None)
+    
+    def nbytes(self) -> int:
+        """Approximate memory held by the trace arrays"""
+        arrays = [self.kinds, self.cells, self.explored_log, self.step_starts, self.frontier_sizes,
+                  self.explored_starts, self.explored_ends] + self.checkpoints
+        return sum(len(a) * a.itemsize for a in arrays) + len(self._explored_mask)
+
+
+class StepCounter:
+    """Drop-in replacement for SearchTrace that only keeps run statistics
+    
+    Used when history recording is disabled: nothing is stored per event,
+    so memory stays constant however long the search runs.
+    """
+    
+    def __init__(self, rows: int = 0, cols: int = 0):
+        self.rows = rows
+        self.cols = cols
+        self.steps = 0
+        self.expansions = 0
+        self.peak_frontier = 0
+        self.obstacle_steps = []
+    
+    def __len__(self) -> int:
+        """Number of counted steps"""
+        return self.steps
+    
+    def begin_step(self, frontier_size: int, obstacle: Tuple[int, int] = None) -> bool:
+        """Count a step; never asks for a checkpoint"""
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if obstacle is not None:
+            self.obstacle_steps.append(self.steps)
+        self.steps += 1
+        return False
+    
+    def checkpoint(self, frontier: Iterable[int]):
+        pass
+    
+    def push(self, cell: int):
+        pass
+    
+    def pop(self, cell: int):
+        pass
+    
+    def explore(self, cell: int):
+        self.expansions += 1
+    
+    def reset(self):
+        pass
+
+
+class StepEvents(StepCounter):
+    """StepCounter that also keeps the events of the two most recent steps
+    
+    Lets SearchAlgorithms.stream() report each step as it finishes without
+    storing the run's history.
+    """
+    
+    def __init__(self, rows: int = 0, cols: int = 0):
+        super().__init__(rows, cols)
+        self._previous = []
+        self._current = []
+        self._explored: Set[int] = set()  # Explored set of the current round, to drop repeats like SearchTrace
+        self.initial_frontier = []  # Frontier of the first step; later frontiers follow from the events
+    
+    def begin_step(self, frontier_size: int, obstacle: Tuple[int, int] = None) -> bool:
+        """Count a step; asks for a checkpoint of the first step only"""
+        self._previous = self._current
+        self._current = [] if obstacle is None else [(OBSTACLE, obstacle[0] * self.cols + obstacle[1])]
+        super().begin_step(frontier_size, obstacle)
+        return self.steps == 1
+    
+    def checkpoint(self, frontier: Iterable[int]):
+        if self.steps == 1:
+            self.initial_frontier = [divmod(cell, self.cols) for cell in frontier]
+    
+    def push(self, cell: int):
+        self._current.append((PUSH, cell))
+    
+    def pop(self, cell: int):
+        self._current.append((POP, cell))
+    
+    def explore(self, cell: int):
+        self.expansions += 1
+        if cell not in self._explored:
+            self._explored.add(cell)
+            self._current.append((EXPLORE, cell))
+    
+    def reset(self):
+        self._explored.clear()
+        self._current.append((RESET, -1))
+    
+    def step_events(self, step: int) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        """Events of the current or the previous step, with cells as (row, col)"""
+        if step < 0:
+            step += self.steps
+        if step == self.steps - 1:
+            events = self._current
+        elif step == self.steps - 2:
+            events = self._previous
+        else:
+            raise IndexError("only the two most recent steps are kept")
+        cols = self.cols
+        return ((kind, divmod(cell, cols) if cell >= 0 else None) for kind, cell in events)
+
+
+class TraceHistory:
+    """Read-only list-like view of per-step frontier or explored states of a trace
+    
+    Keeps ``SearchAlgorithms.frontier_history`` / ``explored_history`` usable
+    while each state is rebuilt from the trace on access.
+    """
+    
+    def __init__(self, trace: SearchTrace, kind: str):
+        self._trace = trace
+        self._state_at = trace.frontier_at if kind == "frontier" else trace.explored_at
+    
+    def __len__(self) -> int:
+        return len(self._trace)
+    
+    def __getitem__(self, step):
+        if isinstance(step, slice):
+            return [self._state_at(k) for k in range(*step.indices(len(self)))]
+        return self._state_at(step)
+    
+    def __iter__(self):
+        for step in range(len(self)):
+            yield self._state_at(step)
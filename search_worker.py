@@ -0,0 +1,87 @@
+"""
+Search Worker
+Runs a streamed search on a background thread and hands its steps to the
+GUI through a bounded, thread-safe channel
+"""
+
+import queue
+import threading
+from typing import List, Optional
+
+import config
+from grid_environment import SearchAlgorithms
+from search_trace import SearchStep
+
+
+class SearchWorker:
+    """Background thread that pulls SearchAlgorithms.stream() steps into a queue
+    
+    The worker runs ahead of the animation by at most max_pending steps, so
+    a slow search never blocks the caller and a fast one never buffers its
+    whole history. poll() never blocks; cancel() stops the search at the
+    next step boundary.
+    """
+    
+    def __init__(self, search: SearchAlgorithms, algorithm: str, max_pending: int = config.WORKER_QUEUE_SIZE):
+        if algorithm not in config.ALGORITHM_METHODS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        self.search = search
+        self.algorithm = algorithm
+        self.error: Optional[BaseException] = None  # Exception raised by the search, if any
+        self._channel: "queue.Queue[SearchStep]" = queue.Queue(max_pending)
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"search-{algorithm}", daemon=True)
+    
+    def start(self) -> "SearchWorker":
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        steps = self.search.stream(self.algorithm)
+        try:
+            for step in steps:
+                # Wait for room in the channel, but keep checking for cancellation
+                while not self._cancelled.is_set():
+                    try:
+                        self._channel.put(step, timeout=0.05)
+                        break
+                    except queue.Full:
+                        pass
+                if self._cancelled.is_set() or step.done:
+                    break
+        except Exception as error:
+            self.error = error
+        finally:
+            steps.close()
+            self._finished.set()
+    
+    @property
+    def path(self) -> List:
+        """Final path, once the last step has been polled"""
+        return self.search.path
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    @property
+    def finished(self) -> bool:
+        """The worker thread is done and every step it produced has been polled"""
+        return self._finished.is_set() and self._channel.empty()
+    
+    def poll(self, max_steps: int) -> List[SearchStep]:
+        """Up to max_steps steps that are ready, without waiting"""
+        steps = []
+        while len(steps) < max_steps:
+            try:
+                steps.append(self._channel.get_nowait())
+            except queue.Empty:
+                break
+        return steps
+    
+    def cancel(self, timeout: Optional[float] = 1.0):
+        """Stop the search at the next step boundary and wait up to timeout for the thread"""
+        self._cancelled.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
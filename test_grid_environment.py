@@ -0,0 +1,49 @@
+"""
+Tests for GridEnvironment occupancy
+"""
+
+from grid_environment import GridEnvironment
+
+
+def _empty_grid() -> GridEnvironment:
+    grid = GridEnvironment(6, 6, wall_probability=0)
+    grid.obstacle_probability = 0
+    return grid
+
+
+def test_obstacle_does_not_replace_wall():
+    grid = _empty_grid()
+    grid.walls.add((2, 3))
+    grid.dynamic_obstacles.add((2, 3))
+    assert (2, 3) in grid.walls
+    assert (2, 3) not in grid.dynamic_obstacles
+    grid.reset_dynamic_obstacles()
+    assert (2, 3) in grid.walls
+
+
+def test_wall_does_not_replace_obstacle():
+    grid = _empty_grid()
+    grid.dynamic_obstacles.add((4, 1))
+    grid.walls.add((4, 1))
+    assert (4, 1) in grid.dynamic_obstacles
+    assert (4, 1) not in grid.walls
+
+
+def test_discard_only_frees_own_state():
+    grid = _empty_grid()
+    grid.walls.add((1, 1))
+    grid.dynamic_obstacles.add((3, 3))
+    grid.dynamic_obstacles.discard((1, 1))
+    grid.walls.discard((3, 3))
+    assert (1, 1) in grid.walls
+    assert (3, 3) in grid.dynamic_obstacles
+
+
+def test_bulk_assignment_keeps_other_state():
+    grid = _empty_grid()
+    grid.walls = [(0, 5), (5, 0)]
+    grid.dynamic_obstacles = [(0, 5), (2, 2)]
+    assert set(grid.walls) == {(0, 5), (5, 0)}
+    assert set(grid.dynamic_obstacles) == {(2, 2)}
+    grid.reset_dynamic_obstacles()
+    assert set(grid.walls) == {(0, 5), (5, 0)}
@@ -0,0 +1,46 @@
+"""
+Tests for the incremental LPA* replanner
+"""
+
+import random
+
+from grid_environment import GridEnvironment, SearchAlgorithms
+from replanner import LPAStar
+
+
+def _ucs_cost(grid: GridEnvironment):
+    """Cost of a from-scratch ucs() path on grid as it is now, or None"""
+    probability, grid.obstacle_probability = grid.obstacle_probability, 0
+    search = SearchAlgorithms(grid, record_trace=False)
+    found = search.ucs()
+    grid.obstacle_probability = probability
+    return search.path_cost(search.path) if found else None
+
+
+def test_replan_after_random_edits():
+    """Random block/unblock edits with an obstacle-spawning ucs() run between replans
+    
+    This sequence used to leave a cell inconsistent on a float key tie, and
+    the path walk then cycled through it forever.
+    """
+    random.seed(4)
+    grid = GridEnvironment(10, 10, wall_probability=0.25)
+    planner = LPAStar(grid)
+    for _ in range(16):
+        for _ in range(random.randint(1, 8)):
+            pos = (random.randrange(grid.rows), random.randrange(grid.cols))
+            cells = random.choice([grid.walls, grid.dynamic_obstacles])
+            if random.random() < 0.5:
+                cells.add(pos)
+            else:
+                cells.discard(pos)
+        SearchAlgorithms(grid, record_trace=False).ucs()
+        
+        path = planner.replan()
+        expected = _ucs_cost(grid)
+        if expected is None or not grid.is_valid(grid.target):
+            assert path == []
+            continue
+        assert path[0] == grid.start and path[-1] == grid.target
+        assert all(b in grid.get_neighbors(a) for a, b in zip(path, path[1:]))
+        assert abs(SearchAlgorithms.path_cost(path) - expected) < 1e-6
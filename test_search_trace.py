@@ -0,0 +1,23 @@
+"""
+Tests for the search trace recorders
+"""
+
+import random
+
+from grid_environment import GridEnvironment, SearchAlgorithms
+
+
+def _stream(grid_bytes: bytes, algorithm: str, record_trace: bool):
+    grid = GridEnvironment.from_bytes(grid_bytes)
+    grid.obstacle_probability = 0
+    return list(SearchAlgorithms(grid, record_trace=record_trace).stream(algorithm))
+
+
+def test_depth_limited_streams_match_across_recorders():
+    """DLS/IDDFS re-expand cells; SearchTrace and StepEvents must report them alike"""
+    random.seed(3)
+    grid_bytes = GridEnvironment(12, 12, wall_probability=0.2).to_bytes()
+    for algorithm in ("dls", "iddfs"):
+        recorded = _stream(grid_bytes, algorithm, True)
+        streamed = _stream(grid_bytes, algorithm, False)
+        assert recorded == streamed
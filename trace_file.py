@@ -0,0 +1,365 @@
+"""
+Trace Files
+Versioned binary format for recorded search runs, written one step at a
+time and read back through a memory map
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+from array import array
+from collections import Counter
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from grid_environment import GridEnvironment, SearchAlgorithms
+from search_trace import EVENT_NAMES, EXPLORE, OBSTACLE, POP, PUSH, RESET, SearchStep, SearchTrace
+
+# File layout (little-endian, sections start on 8-byte boundaries):
+#   header      _HEADER
+#   grid        GridEnvironment.to_bytes() snapshot taken before the run
+#   events      uint32 per event: kind << KIND_SHIFT | flat cell id (NO_CELL for RESET)
+#   step index  uint64 per step: position of the step's first event
+#   path        uint32 flat cell ids of the final path
+#   frontier    uint32 flat cell ids of the frontier when the first step began
+TRACE_MAGIC = b"APTRACE\0"
+TRACE_VERSION = 1
+
+KIND_SHIFT = 29
+NO_CELL = (1 << KIND_SHIFT) - 1  # Also the cell id mask; grids must have fewer cells
+
+# magic, version, success (-1 unknown), algorithm, rows, cols, grid snapshot size,
+# steps, events, path length, initial frontier length, then the offsets of
+# the events, step index, path and initial frontier sections
+_HEADER = struct.Struct("<8sHbx20sIIIQQQQQQQQ")
+
+SCAN_CHUNK = 1 << 22  # Events decoded at a time when rebuilding state from a large trace
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class TraceWriter:
+    """Writes the steps of one run to a trace file as they are produced
+    
+    Events are buffered in small batches and written straight to disk, so a
+    run of any length needs memory only for the step index (8 bytes per
+    step). Set success, path and initial_frontier before close(); the
+    header is written last, so a file from an interrupted run (see abort())
+    is rejected by TraceReader.
+    """
+    
+    def __init__(self, path: str, grid: GridEnvironment, algorithm: str, buffer_events: int = 1 << 16):
+        if grid.rows * grid.cols > NO_CELL:
+            raise ValueError(f"{grid.rows}x{grid.cols} grid has too many cells for a trace file")
+        self.algorithm = algorithm
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.success: Optional[bool] = None
+        self.path: List[Tuple[int, int]] = []
+        self.initial_frontier: List[Tuple[int, int]] = []
+        self.event_count = 0
+        self._buffer_events = buffer_events
+        self._events: List[int] = []
+        self._step_starts = array("Q")
+        
+        snapshot = grid.to_bytes()
+        self._grid_size = len(snapshot)
+        self._file = open(path, "wb")
+        self._file.write(bytes(_HEADER.size))  # Filled in by close()
+        self._file.write(snapshot)
+        self._pad()
+        self._events_offset = self._file.tell()
+    
+    def __enter__(self) -> "TraceWriter":
+        return self
+    
+    def __exit__(self, *exc_info):
+        if exc_info[0] is not None:
+            self.abort()
+        else:
+            self.close()
+    
+    def _pad(self):
+        self._file.write(bytes(_align(self._file.tell()) - self._file.tell()))
+    
+    def _flush_events(self):
+        self._file.write(np.array(self._events, dtype="<u4").tobytes())
+        self.event_count += len(self._events)
+        self._events = []
+    
+    def _cell_ids(self, cells: List[Tuple[int, int]]) -> bytes:
+        return np.array([r * self.cols + c for r, c in cells], dtype="<u4").tobytes()
+    
+    def write_step(self, step: SearchStep):
+        """Append one step and its events"""
+        self._step_starts.append(self.event_count + len(self._events))
+        cols = self.cols
+        self._events.extend(kind << KIND_SHIFT | (NO_CELL if pos is None else pos[0] * cols + pos[1])
+                            for kind, pos in step.events)
+        if len(self._events) >= self._buffer_events:
+            self._flush_events()
+    
+    def close(self):
+        """Write the step index, the path and the header"""
+        if self._file.closed:
+            return
+        self._flush_events()
+        self._pad()
+        steps_offset = self._file.tell()
+        if sys.byteorder == "big":
+            self._step_starts.byteswap()  # The file is little-endian
+        self._file.write(self._step_starts.tobytes())
+        path_offset = self._file.tell()
+        self._file.write(self._cell_ids(self.path))
+        frontier_offset = self._file.tell()
+        self._file.write(self._cell_ids(self.initial_frontier))
+        
+        success = -1 if self.success is None else int(self.success)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, success, self.algorithm.encode(),
+                                      self.rows, self.cols, self._grid_size, len(self._step_starts),
+                                      self.event_count, len(self.path), len(self.initial_frontier),
+                                      self._events_offset, steps_offset, path_offset, frontier_offset))
+        self._file.close()
+    
+    def abort(self):
+        """Close the file without its header, so TraceReader rejects it"""
+        self._file.close()
+
+
+def record(search: SearchAlgorithms, algorithm: str, path: str) -> bool:
+    """Run an algorithm through search.stream() and write every step to a trace file"""
+    with TraceWriter(path, search.grid, algorithm) as writer:
+        for step in search.stream(algorithm):
+            if step.index == 0 and len(search.trace):  # A run cut off before its first step has no frontier
+                trace = search.trace
+                writer.initial_frontier = (trace.frontier_at(0) if isinstance(trace, SearchTrace)
+                                           else trace.initial_frontier)
+            writer.write_step(step)
+            if step.done:
+                writer.success = step.success
+        writer.path = search.path if writer.success else []  # A failed run leaves the previous path in place
+    return bool(writer.success)
+
+
+class TraceReader:
+    """Read-only access to a trace file through a memory map
+    
+    Nothing but the header and grid snapshot is read up front; events and
+    the step index are NumPy views of the mapped file, so the operating
+    system pages in only the parts that are actually visited.
+    """
+    
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a trace file")
+        if len(self._map) < _HEADER.size or self._map[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a trace file (or its run did not finish)")
+        (_, version, success, algorithm, self.rows, self.cols, grid_size, steps, events, path_length,
+         frontier_length, events_offset, steps_offset, path_offset, frontier_offset) = _HEADER.unpack_from(self._map)
+        if version != TRACE_VERSION:
+            self.close()
+            raise ValueError(f"unsupported trace file version {version}")
+        self.version = version
+        self.algorithm = algorithm.rstrip(b"\0").decode()
+        self.success = None if success < 0 else bool(success)
+        self._grid_bytes = self._map[_HEADER.size:_HEADER.size + grid_size]
+        self.events = np.frombuffer(self._map, dtype="<u4", count=events, offset=events_offset)
+        self.step_starts = np.frombuffer(self._map, dtype="<u8", count=steps, offset=steps_offset)
+        self._path = np.frombuffer(self._map, dtype="<u4", count=path_length, offset=path_offset)
+        self._initial_frontier = np.frombuffer(self._map, dtype="<u4", count=frontier_length, offset=frontier_offset)
+    
+    def __enter__(self) -> "TraceReader":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self) -> int:
+        """Number of recorded steps"""
+        return len(self.step_starts)
+    
+    def close(self):
+        """Release the memory map and the file"""
+        self.events = self.step_starts = self._path = self._initial_frontier = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Arrays taken from the reader are still alive; the map goes away with them
+        self._file.close()
+    
+    def grid(self) -> GridEnvironment:
+        """The grid as it was when the run started"""
+        return GridEnvironment.from_bytes(self._grid_bytes)
+    
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        """Final path of the run"""
+        cols = self.cols
+        return [divmod(cell, cols) for cell in self._path.tolist()]
+    
+    def _check_step(self, step: int) -> int:
+        if step < 0:
+            step += len(self)
+        if step < 0 or step >= len(self):
+            raise IndexError("trace step out of range")
+        return step
+    
+    def _step_end(self, step: int) -> int:
+        return int(self.step_starts[step + 1]) if step + 1 < len(self) else len(self.events)
+    
+    def _decode(self, start: int, end: int) -> List[Tuple[int, Optional[Tuple[int, int]]]]:
+        codes = self.events[start:end]
+        cols = self.cols
+        return [(kind, None if cell == NO_CELL else divmod(cell, cols))
+                for kind, cell in zip((codes >> KIND_SHIFT).tolist(), (codes & NO_CELL).tolist())]
+    
+    def step_events(self, step: int) -> List[Tuple[int, Optional[Tuple[int, int]]]]:
+        """Events recorded during a step as (kind, cell) pairs; RESET carries no cell"""
+        step = self._check_step(step)
+        return self._decode(int(self.step_starts[step]), self._step_end(step))
+    
+    def steps(self, start: int = 0, block: int = 4096) -> Iterator[SearchStep]:
+        """Steps from start onwards, decoded a block of steps at a time"""
+        count = len(self)
+        for first in range(start, count, block):
+            last = min(first + block, count)
+            base = int(self.step_starts[first])
+            events = self._decode(base, self._step_end(last - 1))
+            bounds = (self.step_starts[first:last] - base).tolist() + [len(events)]
+            for index in range(first, last):
+                offset = index - first
+                done = index == count - 1
+                yield SearchStep(index, events[bounds[offset]:bounds[offset + 1]], done,
+                                 self.success if done else None)
+    
+    def _round_start(self, end: int) -> int:
+        """Position just after the last RESET event before end (0 if there is none)"""
+        while end > 0:
+            begin = max(0, end - SCAN_CHUNK)
+            resets = np.flatnonzero((self.events[begin:end] >> KIND_SHIFT) == RESET)
+            if resets.size:
+                return begin + int(resets[-1]) + 1
+            end = begin
+        return 0
+    
+    def _chunks(self, step: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(kinds, cells) of the events of the current round before a step, chunk by chunk
+        
+        The first round starts with the initial frontier, given as PUSH events.
+        """
+        end = int(self.step_starts[self._check_step(step)])
+        round_start = self._round_start(end)
+        if round_start == 0:
+            yield np.full(len(self._initial_frontier), PUSH), self._initial_frontier
+        for begin in range(round_start, end, SCAN_CHUNK):
+            codes = self.events[begin:min(begin + SCAN_CHUNK, end)]
+            yield codes >> KIND_SHIFT, codes & NO_CELL
+    
+    def explored_cells(self, step: int) -> np.ndarray:
+        """Flat ids of the explored set when a step began, in ascending order"""
+        explored = np.zeros(self.rows * self.cols, dtype=bool)
+        for kinds, cells in self._chunks(step):
+            explored[cells[kinds == EXPLORE]] = True
+        return np.flatnonzero(explored)
+    
+    def frontier_cells(self, step: int) -> Counter:
+        """Frontier multiset of flat ids when a step began"""
+        size = self.rows * self.cols
+        counts = np.zeros(size, dtype=np.int64)
+        for kinds, cells in self._chunks(step):
+            counts += np.bincount(cells[kinds == PUSH], minlength=size)
+            counts -= np.bincount(cells[kinds == POP], minlength=size)
+        cells = np.flatnonzero(counts > 0)
+        return Counter(dict(zip(cells.tolist(), counts[cells].tolist())))
+
+
+class TraceReplay:
+    """Plays a trace file onto a grid through the SearchWorker interface (poll, cancel)
+    
+    Dynamic obstacles recorded in the trace are placed on the grid as their
+    steps are handed out, as they were during the original run.
+    """
+    
+    def __init__(self, reader: TraceReader, grid: GridEnvironment, close_reader: bool = True):
+        self.reader = reader
+        self.grid = grid
+        self.path = reader.path
+        self.error = None
+        self._close_reader = close_reader
+        self._steps = reader.steps()
+        self._finished = False
+    
+    @property
+    def finished(self) -> bool:
+        return self._finished
+    
+    def poll(self, max_steps: int) -> List[SearchStep]:
+        """Up to max_steps steps; fewer only once the trace is exhausted"""
+        steps = list(islice(self._steps, max_steps))
+        for step in steps:
+            for kind, pos in step.events:
+                if kind == OBSTACLE:
+                    self.grid.dynamic_obstacles.add(pos)
+        if len(steps) < max_steps:
+            self.cancel()
+        return steps
+    
+    def cancel(self, timeout: Optional[float] = None):
+        """Stop the replay and release the trace file"""
+        self._finished = True
+        self._steps.close()
+        if self._close_reader:
+            self.reader.close()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="AI Pathfinder search trace files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    record_parser = subparsers.add_parser("record", help="Run an algorithm on a random map and save its trace")
+    record_parser.add_argument("output")
+    record_parser.add_argument("--algorithm", choices=config.ALGORITHM_METHODS, default="bfs")
+    record_parser.add_argument("--size", type=int, default=config.GRID_ROWS)
+    record_parser.add_argument("--wall-probability", type=float, default=0.2)
+    record_parser.add_argument("--obstacle-probability", type=float, default=config.DYNAMIC_OBSTACLE_PROBABILITY)
+    record_parser.add_argument("--seed", type=int, default=0)
+    
+    info_parser = subparsers.add_parser("info", help="Summarize a trace file")
+    info_parser.add_argument("trace")
+    
+    args = parser.parse_args()
+    if args.command == "record":
+        random.seed(args.seed)
+        grid = GridEnvironment(args.size, args.size, args.wall_probability)
+        grid.obstacle_probability = args.obstacle_probability
+        success = record(SearchAlgorithms(grid, record_trace=False), args.algorithm, args.output)
+        print(f"{args.algorithm} on {args.size}x{args.size}: {'path found' if success else 'no path'}, "
+              f"trace written to {args.output}")
+    elif args.command == "info":
+        with TraceReader(args.trace) as reader:
+            kinds = np.zeros(len(EVENT_NAMES), dtype=np.int64)
+            for begin in range(0, len(reader.events), SCAN_CHUNK):
+                kinds += np.bincount(reader.events[begin:begin + SCAN_CHUNK] >> KIND_SHIFT, minlength=len(EVENT_NAMES))
+            print(f"{reader.algorithm} on {reader.rows}x{reader.cols} (format v{reader.version})")
+            print(f"  steps: {len(reader)}  events: {len(reader.events)}  path: {len(reader.path)} cells  "
+                  f"success: {reader.success}")
+            for kind, name in EVENT_NAMES.items():
+                print(f"  {name:<9}{kinds[kind]:>12}")
+
+
+if __name__ == "__main__":
+    main()
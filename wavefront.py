@@ -0,0 +1,147 @@
+"""
+Wavefront Distance Fields
+Vectorized NumPy searches that measure distances from one cell to every
+cell of a GridEnvironment
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import config
+from grid_environment import FREE, GridEnvironment
+
+UNREACHED = -1  # Distance of cells the wavefront never reached
+NO_PARENT = -1  # Parent direction of the source and of unreached cells
+
+
+class DistanceField:
+    """Distances from a source cell plus the move that reached each cell
+    
+    ``distance[r, c]`` is the number of moves (or the move cost, for
+    weighted fields) from the source, UNREACHED if the cell cannot be reached, and ``parent[r, c]`` is the index into
+    config.DIRECTIONS of the last move on a shortest path to the cell.
+    """
+    
+    def __init__(self, source: Tuple[int, int], distance: np.ndarray, parent: np.ndarray):
+        self.source = source
+        self.distance = distance
+        self.parent = parent
+    
+    @property
+    def nbytes(self) -> int:
+        return self.distance.nbytes + self.parent.nbytes
+    
+    def reachable(self, pos: Tuple[int, int]) -> bool:
+        return self.distance[pos] != UNREACHED
+    
+    def path_to(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Shortest path source -> pos following parent directions, empty if unreachable"""
+        if not self.reachable(pos):
+            return []
+        path = self.path_from(pos)
+        path.reverse()
+        return path
+    
+    def path_from(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Shortest path pos -> source (moves are reversible), empty if unreachable"""
+        if not self.reachable(pos):
+            return []
+        parent = self.parent
+        r, c = pos
+        path = [(r, c)]
+        direction = parent[r, c]
+        while direction != NO_PARENT:
+            dr, dc = config.DIRECTIONS[direction]
+            r -= dr
+            c -= dc
+            path.append((r, c))
+            direction = parent[r, c]
+        return path
+
+
+def wavefront(grid: GridEnvironment, source: Optional[Tuple[int, int]] = None) -> DistanceField:
+    """Hop distances from source (default grid.start) to every free cell
+    
+    Each wave gathers the 8 neighbors of the current frontier through fixed
+    offsets into the padded occupancy array, so no bounds checks are needed
+    and the work per wave is proportional to the frontier, not the map.
+    Neighbors are claimed in config.DIRECTIONS order.
+    """
+    if source is None:
+        source = grid.start
+    stride = grid._stride
+    offsets = [dr * stride + dc for dr, dc in config.DIRECTIONS]
+    
+    open_cells = (grid.occupancy == FREE).ravel()  # Free and not yet reached
+    distance = np.full(open_cells.size, UNREACHED, dtype=np.int32)
+    parent = np.full(open_cells.size, NO_PARENT, dtype=np.int8)
+    
+    if grid.in_bounds(source):
+        start = (source[0] + 1) * stride + source[1] + 1
+        distance[start] = 0
+        open_cells[start] = False
+        frontier = np.array([start], dtype=np.intp)
+    else:
+        frontier = np.empty(0, dtype=np.intp)
+    
+    level = 0
+    while frontier.size:
+        level += 1
+        waves = []
+        for direction, offset in enumerate(offsets):
+            reached = frontier + offset
+            reached = reached[open_cells[reached]]
+            open_cells[reached] = False
+            distance[reached] = level
+            parent[reached] = direction
+            waves.append(reached)
+        frontier = np.concatenate(waves)
+    
+    shape = grid.occupancy.shape
+    return DistanceField(source,
+                         distance.reshape(shape)[1:-1, 1:-1].copy(),
+                         parent.reshape(shape)[1:-1, 1:-1].copy())
+
+
+def weighted_wavefront(grid: GridEnvironment, source: Optional[Tuple[int, int]] = None) -> DistanceField:
+    """Cheapest ucs() move costs (1 straight, 1.414 diagonal) from source to every free cell
+    
+    Vectorized label-correcting search: every round relaxes the 8 moves out
+    of the cells whose cost dropped in the previous round, until no cost
+    changes. The result matches Dijkstra's costs; distances are float64.
+    """
+    if source is None:
+        source = grid.start
+    stride = grid._stride
+    moves = [(dr * stride + dc, grid.move_cost(dr, dc)) for dr, dc in config.DIRECTIONS]
+    
+    passable = (grid.occupancy == FREE).ravel()
+    distance = np.full(passable.size, np.inf)
+    parent = np.full(passable.size, NO_PARENT, dtype=np.int8)
+    
+    if grid.in_bounds(source):
+        start = (source[0] + 1) * stride + source[1] + 1
+        distance[start] = 0.0
+        active = np.array([start], dtype=np.intp)
+    else:
+        active = np.empty(0, dtype=np.intp)
+    
+    while active.size:
+        improved = []
+        for direction, (offset, cost) in enumerate(moves):
+            reached = active + offset
+            new_cost = distance[active] + cost
+            # Tolerance keeps equal-cost paths that differ only by rounding from re-queuing
+            better = passable[reached] & (new_cost < distance[reached] - 1e-9)
+            reached = reached[better]
+            distance[reached] = new_cost[better]
+            parent[reached] = direction
+            improved.append(reached)
+        active = np.unique(np.concatenate(improved))
+    
+    distance[np.isinf(distance)] = UNREACHED
+    shape = grid.occupancy.shape
+    return DistanceField(source,
+                         distance.reshape(shape)[1:-1, 1:-1].copy(),
+                         parent.reshape(shape)[1:-1, 1:-1].copy())